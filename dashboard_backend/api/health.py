@@ -1,56 +1,145 @@
 """Health, metrics, and analytics endpoints for the dashboard."""
 
+import asyncio
+import functools
+import logging
 import time
+from datetime import timedelta
 
+import asyncpg
 import httpx
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import case, desc, extract, func, text
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy import desc, func, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from dashboard_backend.api.queries import _parse_time_range
 from dashboard_backend.config import get_settings
-from dashboard_backend.db import get_db
-from dashboard_backend.models import IndexingJob, QueryLog, SystemMetric
+from dashboard_backend.db import get_db, get_pg_pool
+from dashboard_backend.models import IndexingJob, QueryLog
 from dashboard_backend.schemas import (
     AnalyticsResponse,
     ComponentHealth,
-    DocumentTypeBreakdown,
-    HourlyHeatmapPoint,
     MetricPoint,
     MetricsResponse,
-    PopularQuery,
-    QueryTrendPoint,
-    ResponseTimeBucket,
     SystemHealthResponse,
 )
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/dashboard", tags=["health"])
 
 # Track server start time for uptime
 _start_time = time.time()
 
+# Shared HTTP client for ChromaDB probes (keep-alive across health checks)
+_http_client: httpx.AsyncClient | None = None
+_chroma_collection_id: str | None = None
+
+# Cached responses keyed by function name: (value, expiry monotonic time)
+_cache: dict[str, tuple[object, float]] = {}
+_cache_locks: dict[str, asyncio.Lock] = {}
+
+
+def async_ttl_cache(ttl_seconds: float):
+    """Cache an async function's result for ``ttl_seconds``.
+
+    Concurrent callers for the same key wait on a shared lock so a burst of
+    dashboard polls triggers a single upstream probe. If recomputing fails
+    and a previous value exists, the stale value is served instead.
+    """
+
+    def decorator(func):
+        key = func.__name__
+        _cache_locks[key] = asyncio.Lock()
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            cached = _cache.get(key)
+            if cached and cached[1] > time.monotonic():
+                return cached[0]
+
+            async with _cache_locks[key]:
+                # Another caller may have refreshed the entry while we waited
+                cached = _cache.get(key)
+                if cached and cached[1] > time.monotonic():
+                    return cached[0]
+                try:
+                    value = await func(*args, **kwargs)
+                except Exception:
+                    if cached:
+                        logger.warning(
+                            "Refreshing %s failed, serving stale value", key, exc_info=True
+                        )
+                        return cached[0]
+                    raise
+                _cache[key] = (value, time.monotonic() + ttl_seconds)
+                return value
+
+        return wrapper
+
+    return decorator
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        settings = get_settings()
+        _http_client = httpx.AsyncClient(
+            base_url=f"http://{settings.chroma_host}:{settings.chroma_port}/api/v2/tenants/default_tenant/databases/default_database",
+            timeout=5.0,
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared ChromaDB probe client."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 
 @router.get("/health", response_model=SystemHealthResponse)
 async def get_system_health(
     db: AsyncSession = Depends(get_db),
 ):
     """Get system health status for all components."""
+    health = await _compute_health(db)
+    # Uptime is cheap to compute and should not lag behind the cache
+    return health.model_copy(update={"uptime_seconds": round(time.time() - _start_time, 1)})
+
+
+@router.get("/metrics", response_model=MetricsResponse)
+async def get_system_metrics(
+    pool: asyncpg.Pool = Depends(get_pg_pool),
+):
+    """Get current system metrics."""
+    return await _compute_metrics(pool)
+
+
+# Health probe statements, built once at import
+_PING = text("SELECT 1")
+_LAST_QUERY_TIME = select(QueryLog.timestamp).order_by(desc(QueryLog.timestamp)).limit(1)
+_ACTIVE_JOB_COUNT = (
+    select(func.count()).select_from(IndexingJob).where(IndexingJob.status == "processing")
+)
+
+
+@async_ttl_cache(get_settings().health_cache_ttl)
+async def _compute_health(db: AsyncSession) -> SystemHealthResponse:
     components = []
 
     # Check database connection
     try:
-        await db.execute(text("SELECT 1"))
+        await db.execute(_PING)
         components.append(ComponentHealth(name="PostgreSQL", status="connected"))
     except Exception as e:
         components.append(ComponentHealth(name="PostgreSQL", status="error", details=str(e)))
 
     # Check MCP server (look for recent metrics or queries)
     try:
-        recent_query = await db.execute(
-            select(QueryLog.timestamp)
-            .order_by(desc(QueryLog.timestamp))
-            .limit(1)
-        )
+        recent_query = await db.execute(_LAST_QUERY_TIME)
         last_query = recent_query.scalar_one_or_none()
         if last_query:
             components.append(ComponentHealth(name="MCP Server", status="running", details=f"Last query: {last_query}"))
@@ -60,9 +149,7 @@ async def get_system_health(
         components.append(ComponentHealth(name="MCP Server", status="unknown", details="Could not determine status"))
 
     # Check for active indexing jobs
-    active_jobs_result = await db.execute(
-        select(func.count()).select_from(IndexingJob).where(IndexingJob.status == "processing")
-    )
+    active_jobs_result = await db.execute(_ACTIVE_JOB_COUNT)
     active_count = active_jobs_result.scalar() or 0
     components.append(
         ComponentHealth(
@@ -72,21 +159,9 @@ async def get_system_health(
         )
     )
 
-    # Check vector DB by probing ChromaDB directly
+    # Check vector DB (probe result is cached separately and for longer)
     try:
-        settings = get_settings()
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            vdb_resp = await client.get(
-                f"http://{settings.chroma_host}:{settings.chroma_port}/api/v2/tenants/default_tenant/databases/default_database/collections/{settings.chroma_collection}"
-            )
-            if vdb_resp.status_code == 200:
-                count_resp = await client.get(
-                    f"http://{settings.chroma_host}:{settings.chroma_port}/api/v2/tenants/default_tenant/databases/default_database/collections/{vdb_resp.json()['id']}/count"
-                )
-                doc_count = count_resp.json() if count_resp.status_code == 200 else "?"
-                components.append(ComponentHealth(name="Vector Database", status="connected", details=f"{doc_count} chunks indexed"))
-            else:
-                components.append(ComponentHealth(name="Vector Database", status="warning", details="Collection not found"))
+        components.append(await _probe_vector_db())
     except Exception:
         components.append(ComponentHealth(name="Vector Database", status="error", details="ChromaDB unreachable"))
 
@@ -106,198 +181,239 @@ async def get_system_health(
     )
 
 
-@router.get("/metrics", response_model=MetricsResponse)
-async def get_system_metrics(
-    db: AsyncSession = Depends(get_db),
-):
-    """Get current system metrics."""
-    # Fetch the latest metrics from the database
-    latest_metrics_query = (
-        select(SystemMetric)
-        .order_by(desc(SystemMetric.timestamp))
-        .limit(50)
+@async_ttl_cache(get_settings().chroma_probe_cache_ttl)
+async def _probe_vector_db() -> ComponentHealth:
+    """Probe ChromaDB for the indexed chunk count.
+
+    The collection id is remembered after the first lookup, so later probes
+    need only the count request. Connection errors propagate so the cache
+    can serve the last good result.
+    """
+    global _chroma_collection_id
+    client = _get_http_client()
+    if _chroma_collection_id is None:
+        vdb_resp = await client.get(f"/collections/{get_settings().chroma_collection}")
+        if vdb_resp.status_code != 200:
+            return ComponentHealth(
+                name="Vector Database", status="warning", details="Collection not found"
+            )
+        _chroma_collection_id = vdb_resp.json()["id"]
+
+    count_resp = await client.get(f"/collections/{_chroma_collection_id}/count")
+    if count_resp.status_code == 404:
+        # Collection was recreated under a new id; look it up again next time
+        _chroma_collection_id = None
+        return ComponentHealth(
+            name="Vector Database", status="warning", details="Collection not found"
+        )
+    doc_count = count_resp.json() if count_resp.status_code == 200 else "?"
+    return ComponentHealth(
+        name="Vector Database", status="connected", details=f"{doc_count} chunks indexed"
+    )
+
+
+_LATEST_METRICS_SQL = """
+    SELECT metric_name, metric_value, timestamp, labels
+    FROM system_metrics
+    ORDER BY timestamp DESC
+    LIMIT 50
+"""
+
+_ACTIVE_CONNECTIONS_SQL = "SELECT count(*) FROM pg_stat_activity WHERE datname = $1"
+
+# pg_stat_activity is scanned by a background task rather than per request
+_active_connections = 0
+_pg_stat_task: asyncio.Task | None = None
+
+
+async def _refresh_active_connections(pool: asyncpg.Pool, interval: float):
+    """Periodically count this database's backends into ``_active_connections``."""
+    global _active_connections
+    datname = None
+    while True:
+        try:
+            if datname is None:
+                datname = await pool.fetchval("SELECT current_database()")
+            _active_connections = await pool.fetchval(_ACTIVE_CONNECTIONS_SQL, datname) or 0
+        except Exception as exc:
+            logger.debug("Failed to refresh active connections: %s", exc)
+        await asyncio.sleep(interval)
+
+
+async def start_pg_stat_refresh():
+    """Start the active connection poller (PostgreSQL only)."""
+    global _pg_stat_task
+    try:
+        pool = await get_pg_pool()
+    except RuntimeError:
+        return
+    _pg_stat_task = asyncio.create_task(
+        _refresh_active_connections(pool, get_settings().pg_stat_refresh_interval)
     )
-    result = await db.execute(latest_metrics_query)
-    metrics = result.scalars().all()
+
+
+async def stop_pg_stat_refresh():
+    """Stop the active connection poller."""
+    global _pg_stat_task
+    if _pg_stat_task is not None:
+        _pg_stat_task.cancel()
+        _pg_stat_task = None
+
+
+@async_ttl_cache(get_settings().health_cache_ttl)
+async def _compute_metrics(pool: asyncpg.Pool) -> MetricsResponse:
+    metrics = await pool.fetch(_LATEST_METRICS_SQL)
 
     # Extract specific metrics from the latest batch
     cpu = None
     memory = None
     disk = None
     for m in metrics:
-        if m.metric_name == "cpu_usage" and cpu is None:
-            cpu = m.metric_value
-        elif m.metric_name == "memory_usage_mb" and memory is None:
-            memory = m.metric_value
-        elif m.metric_name == "disk_usage_gb" and disk is None:
-            disk = m.metric_value
-
-    # Active DB connections (approximate)
-    conn_result = await db.execute(text(
-        "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()"
-    ))
-    active_connections = conn_result.scalar() or 0
-
-    return MetricsResponse(
+        if m["metric_name"] == "cpu_usage" and cpu is None:
+            cpu = m["metric_value"]
+        elif m["metric_name"] == "memory_usage_mb" and memory is None:
+            memory = m["metric_value"]
+        elif m["metric_name"] == "disk_usage_gb" and disk is None:
+            disk = m["metric_value"]
+
+    return MetricsResponse.model_construct(
         cpu_usage=cpu,
         memory_usage_mb=memory,
         disk_usage_gb=disk,
-        active_connections=active_connections,
+        active_connections=_active_connections,
         recent_metrics=[
-            MetricPoint(
-                metric_name=m.metric_name,
-                metric_value=m.metric_value,
-                timestamp=m.timestamp,
-                labels=m.labels,
+            MetricPoint.model_construct(
+                metric_name=m["metric_name"],
+                metric_value=m["metric_value"],
+                timestamp=m["timestamp"],
+                labels=m["labels"],
             )
             for m in metrics
         ],
     )
 
 
-@router.get("/analytics", response_model=AnalyticsResponse)
-async def get_analytics(
-    time_range: str = Query(default="24h", description="e.g. 1h, 24h, 7d, 30d"),
-    db: AsyncSession = Depends(get_db),
-):
-    """Get comprehensive analytics data for the dashboard."""
-    interval = _parse_time_range(time_range) or "24 hours"
-    since = func.now() - text(f"interval '{interval}'")
-
-    # Total queries
-    total_queries_result = await db.execute(
-        select(func.count()).select_from(QueryLog).where(QueryLog.timestamp >= since)
-    )
-    total_queries = total_queries_result.scalar() or 0
-
-    # Average response time
-    avg_time_result = await db.execute(
-        select(func.avg(QueryLog.response_time_ms)).where(QueryLog.timestamp >= since)
+# All analytics aggregates in one statement. Totals, buckets, trend and
+# heatmap come from the hourly histogram, except for the hour the window
+# starts in: only part of it is inside the window, so that hour is counted
+# from the raw rows. Popular queries need the raw rows too.
+# Installed at startup by create_analytics_function().
+_ANALYTICS_FUNCTION_DDL = """
+CREATE OR REPLACE FUNCTION dashboard_analytics(p_iv interval) RETURNS jsonb
+LANGUAGE sql STABLE AS $$
+    WITH edge AS (
+        SELECT
+            date_trunc('hour', now() - p_iv, 'UTC') AS bucket_hour,
+            count(*) AS total,
+            count(response_time_ms) AS timed,
+            coalesce(sum(response_time_ms), 0) AS response_time_sum,
+            count(*) FILTER (WHERE response_time_ms < 500) AS under_500,
+            count(*) FILTER (WHERE response_time_ms BETWEEN 500 AND 999) AS b500_1000,
+            count(*) FILTER (WHERE response_time_ms BETWEEN 1000 AND 1999) AS b1000_2000,
+            count(*) FILTER (WHERE response_time_ms BETWEEN 2000 AND 4999) AS b2000_5000,
+            count(*) FILTER (WHERE response_time_ms >= 5000) AS over_5000
+        FROM query_logs
+        WHERE timestamp >= now() - p_iv
+          AND timestamp < date_trunc('hour', now() - p_iv, 'UTC') + interval '1 hour'
+    ),
+    hist AS (
+        SELECT bucket_hour, total, timed, response_time_sum,
+               under_500, b500_1000, b1000_2000, b2000_5000, over_5000
+        FROM query_log_buckets_hourly
+        WHERE bucket_hour > date_trunc('hour', now() - p_iv, 'UTC')
+        UNION ALL
+        SELECT * FROM edge WHERE total > 0
+    ),
+    summary AS (
+        SELECT
+            coalesce(sum(total), 0) AS total,
+            sum(response_time_sum)::float8 / nullif(sum(timed), 0) AS avg_time,
+            coalesce(sum(under_500), 0) AS under_500,
+            coalesce(sum(b500_1000), 0) AS b500_1000,
+            coalesce(sum(b1000_2000), 0) AS b1000_2000,
+            coalesce(sum(b2000_5000), 0) AS b2000_5000,
+            coalesce(sum(over_5000), 0) AS over_5000
+        FROM hist
+    ),
+    doc_types AS (
+        SELECT coalesce(source_type, 'unknown') AS doc_type, count(*) AS count,
+               sum(count(*)) OVER () AS total
+        FROM indexing_jobs
+        GROUP BY source_type
     )
-    avg_response_time = avg_time_result.scalar()
-
-    # Total documents indexed (sum of processed_files from completed jobs)
-    total_docs_result = await db.execute(
-        select(func.sum(IndexingJob.processed_files)).where(IndexingJob.status == "completed")
+    SELECT jsonb_build_object(
+        'total_queries', s.total,
+        'total_documents', coalesce(
+            (SELECT sum(processed_files) FROM indexing_jobs WHERE status = 'completed'), 0),
+        'total_jobs', (SELECT count(*) FROM indexing_jobs),
+        'avg_response_time_ms', round(s.avg_time::numeric, 1),
+        'query_trend', coalesce((
+            SELECT jsonb_agg(jsonb_build_object(
+                'timestamp', to_char(bucket_hour AT TIME ZONE 'UTC', 'YYYY-MM-DD HH24:MI:SS"+00:00"'),
+                'count', total) ORDER BY bucket_hour)
+            FROM hist), '[]'::jsonb),
+        'popular_queries', coalesce((
+            SELECT jsonb_agg(jsonb_build_object('query_text', query_text, 'count', count))
+            FROM (
+                SELECT query_text, count(*) AS count
+                FROM query_logs
+                WHERE timestamp >= now() - p_iv
+                GROUP BY query_text
+                ORDER BY count DESC
+                LIMIT 10
+            ) p), '[]'::jsonb),
+        'response_time_distribution', (
+            SELECT jsonb_agg(jsonb_build_object(
+                'bucket', label,
+                'count', count,
+                'percentage', round(count * 100.0 / greatest(s.total, 1), 1)) ORDER BY ord)
+            FROM (VALUES
+                (1, '<0.5s', s.under_500),
+                (2, '0.5-1s', s.b500_1000),
+                (3, '1-2s', s.b1000_2000),
+                (4, '2-5s', s.b2000_5000),
+                (5, '>5s', s.over_5000)
+            ) AS b(ord, label, count)),
+        'hourly_heatmap', coalesce((
+            SELECT jsonb_agg(jsonb_build_object('day_of_week', dow, 'hour', hour, 'count', count)
+                             ORDER BY dow, hour)
+            FROM (
+                SELECT extract(dow FROM bucket_hour)::int AS dow,
+                       extract(hour FROM bucket_hour)::int AS hour,
+                       sum(total) AS count
+                FROM hist
+                GROUP BY 1, 2
+            ) h), '[]'::jsonb),
+        'document_type_breakdown', coalesce((
+            SELECT jsonb_agg(jsonb_build_object(
+                'doc_type', doc_type,
+                'count', count,
+                'percentage', round(count * 100.0 / total, 1))
+                ORDER BY count DESC)
+            FROM doc_types), '[]'::jsonb)
     )
-    total_documents = total_docs_result.scalar() or 0
+    FROM summary s
+$$
+"""
 
-    # Total jobs
-    total_jobs_result = await db.execute(select(func.count()).select_from(IndexingJob))
-    total_jobs = total_jobs_result.scalar() or 0
 
-    # Query trend (hourly buckets)
-    trend_query = (
-        select(
-            func.date_trunc("hour", QueryLog.timestamp).label("bucket"),
-            func.count(QueryLog.id).label("count"),
-        )
-        .where(QueryLog.timestamp >= since)
-        .group_by(text("bucket"))
-        .order_by(text("bucket"))
-    )
-    trend_result = await db.execute(trend_query)
-    query_trend = [
-        QueryTrendPoint(timestamp=str(row.bucket), count=row.count)
-        for row in trend_result.all()
-    ]
-
-    # Popular queries
-    popular_query = (
-        select(QueryLog.query_text, func.count(QueryLog.id).label("count"))
-        .where(QueryLog.timestamp >= since)
-        .group_by(QueryLog.query_text)
-        .order_by(desc("count"))
-        .limit(10)
-    )
-    popular_result = await db.execute(popular_query)
-    popular_queries = [
-        PopularQuery(query_text=row.query_text, count=row.count)
-        for row in popular_result.all()
-    ]
-
-    # Response time distribution
-    total_for_pct = max(total_queries, 1)
-    buckets_query = select(
-        func.sum(case((QueryLog.response_time_ms < 500, 1), else_=0)).label("under_500"),
-        func.sum(case((QueryLog.response_time_ms.between(500, 999), 1), else_=0)).label("b500_1000"),
-        func.sum(case((QueryLog.response_time_ms.between(1000, 1999), 1), else_=0)).label("b1000_2000"),
-        func.sum(case((QueryLog.response_time_ms.between(2000, 4999), 1), else_=0)).label("b2000_5000"),
-        func.sum(case((QueryLog.response_time_ms >= 5000, 1), else_=0)).label("over_5000"),
-    ).where(QueryLog.timestamp >= since)
-    buckets_result = await db.execute(buckets_query)
-    b = buckets_result.one()
-    response_time_distribution = [
-        ResponseTimeBucket(bucket="<0.5s", count=b.under_500 or 0, percentage=round((b.under_500 or 0) / total_for_pct * 100, 1)),
-        ResponseTimeBucket(bucket="0.5-1s", count=b.b500_1000 or 0, percentage=round((b.b500_1000 or 0) / total_for_pct * 100, 1)),
-        ResponseTimeBucket(bucket="1-2s", count=b.b1000_2000 or 0, percentage=round((b.b1000_2000 or 0) / total_for_pct * 100, 1)),
-        ResponseTimeBucket(bucket="2-5s", count=b.b2000_5000 or 0, percentage=round((b.b2000_5000 or 0) / total_for_pct * 100, 1)),
-        ResponseTimeBucket(bucket=">5s", count=b.over_5000 or 0, percentage=round((b.over_5000 or 0) / total_for_pct * 100, 1)),
-    ]
-
-    # Hourly heatmap (day of week x hour of day)
-    heatmap_query = (
-        select(
-            extract("dow", QueryLog.timestamp).label("dow"),
-            extract("hour", QueryLog.timestamp).label("hour"),
-            func.count(QueryLog.id).label("count"),
-        )
-        .where(QueryLog.timestamp >= since)
-        .group_by(text("dow"), text("hour"))
-        .order_by(text("dow"), text("hour"))
-    )
-    heatmap_result = await db.execute(heatmap_query)
-    hourly_heatmap = [
-        HourlyHeatmapPoint(
-            day_of_week=int(row.dow),
-            hour=int(row.hour),
-            count=row.count,
-        )
-        for row in heatmap_result.all()
-    ]
-
-    # Document type breakdown from indexing job metadata
-    doc_type_query = (
-        select(
-            IndexingJob.source_type,
-            func.count(IndexingJob.id).label("count"),
-        )
-        .group_by(IndexingJob.source_type)
-        .order_by(desc("count"))
-    )
-    doc_type_result = await db.execute(doc_type_query)
-    doc_types_raw = doc_type_result.all()
-    total_type_count = sum(r.count for r in doc_types_raw) or 1
-    document_type_breakdown = [
-        DocumentTypeBreakdown(
-            doc_type=row.source_type or "unknown",
-            count=row.count,
-            percentage=round(row.count / total_type_count * 100, 1),
-        )
-        for row in doc_types_raw
-    ]
-
-    return AnalyticsResponse(
-        total_queries=total_queries,
-        total_documents=total_documents,
-        total_jobs=total_jobs,
-        avg_response_time_ms=round(avg_response_time, 1) if avg_response_time else None,
-        query_trend=query_trend,
-        popular_queries=popular_queries,
-        response_time_distribution=response_time_distribution,
-        hourly_heatmap=hourly_heatmap,
-        document_type_breakdown=document_type_breakdown,
-    )
+async def create_analytics_function():
+    """Install the dashboard_analytics() SQL function (PostgreSQL only)."""
+    try:
+        pool = await get_pg_pool()
+    except RuntimeError:
+        return
+    await pool.execute(_ANALYTICS_FUNCTION_DDL)
 
 
-def _parse_time_range(time_range: str) -> str | None:
-    mapping = {
-        "1h": "1 hour",
-        "6h": "6 hours",
-        "12h": "12 hours",
-        "24h": "24 hours",
-        "7d": "7 days",
-        "30d": "30 days",
-        "90d": "90 days",
-    }
-    return mapping.get(time_range)
+@router.get("/analytics", response_model=AnalyticsResponse)
+async def get_analytics(
+    time_range: str = Query(default="24h", description="e.g. 1h, 24h, 7d, 30d"),
+    pool: asyncpg.Pool = Depends(get_pg_pool),
+):
+    """Get comprehensive analytics data for the dashboard."""
+    interval = _parse_time_range(time_range) or timedelta(hours=24)
+    # The function already returns the AnalyticsResponse document; pass its
+    # JSON text through instead of decoding and re-encoding it
+    body = await pool.fetchval("SELECT dashboard_analytics($1)::text", interval)
+    return Response(content=body, media_type="application/json")
@@ -2,135 +2,181 @@
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import desc, func
+import asyncpg
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from sqlalchemy import bindparam, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from dashboard_backend.db import get_db
+from dashboard_backend.db import get_db, get_pg_pool
 from dashboard_backend.models import IndexingJob
 from dashboard_backend.schemas import (
     IndexingJobResponse,
+    JobCancelResponse,
     JobListResponse,
     JobProgressResponse,
 )
 
 router = APIRouter(prefix="/api/dashboard/jobs", tags=["jobs"])
 
+# Columns backing IndexingJobResponse, active jobs first then by start time.
+# The window count carries the unpaginated total on every row.
+_JOB_LIST_SQL = """
+    SELECT id, source_type, source_url, status, total_files, processed_files,
+           failed_files, current_file, progress_percent, started_at, completed_at,
+           error_message, metadata, count(*) OVER () AS total_count
+    FROM indexing_jobs
+    {where}
+    ORDER BY status = 'processing' DESC, started_at DESC
+    OFFSET ${offset} LIMIT ${limit}
+"""
+
+_JOB_COUNT_SQL = "SELECT count(*) FROM indexing_jobs {where}"
+
+# Point selects, prepared once per pooled connection by asyncpg's statement cache
+_JOB_BY_ID_SQL = """
+    SELECT id, source_type, source_url, status, total_files, processed_files,
+           failed_files, current_file, progress_percent, started_at, completed_at,
+           error_message, metadata
+    FROM indexing_jobs
+    WHERE id = $1
+"""
+
+# Remaining time extrapolates the average rate since the job started
+_JOB_PROGRESS_SQL = """
+    SELECT id, status, progress_percent, total_files, processed_files,
+           failed_files, current_file,
+           CASE WHEN status = 'processing' AND processed_files > 0 AND started_at < now()
+                THEN (coalesce(total_files, 0) - processed_files)
+                     * extract(epoch FROM now() - started_at)::float8 / processed_files
+           END AS remaining_s
+    FROM indexing_jobs
+    WHERE id = $1
+"""
+
+# Write-path statements built once at import and bound per request
+_JOB_STATUS_BY_ID = select(IndexingJob.status).where(IndexingJob.id == bindparam("job_id"))
+_CANCEL_JOB = (
+    update(IndexingJob)
+    .where(
+        IndexingJob.id == bindparam("job_id"),
+        IndexingJob.status.in_(("pending", "processing")),
+    )
+    .values(status="cancelled", error_message="Cancelled by user via dashboard")
+    .returning(IndexingJob.id)
+)
+
 
 @router.get("", response_model=JobListResponse)
 async def get_indexing_jobs(
     status: str | None = Query(default=None, description="Filter by status: pending, processing, completed, failed"),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
-    db: AsyncSession = Depends(get_db),
+    pool: asyncpg.Pool = Depends(get_pg_pool),
 ):
     """Get all indexing jobs with optional status filter."""
-    query = select(IndexingJob)
-
+    params: list = []
+    where = ""
     if status:
-        query = query.where(IndexingJob.status == status)
-
-    # Total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Paginated results, active jobs first then by start time
-    query = query.order_by(
-        desc(IndexingJob.status == "processing"),
-        desc(IndexingJob.started_at),
-    ).offset(offset).limit(limit)
-
-    result = await db.execute(query)
-    rows = result.scalars().all()
-
-    return JobListResponse(
-        jobs=[IndexingJobResponse.model_validate(r) for r in rows],
+        params.append(status)
+        where = "WHERE status = $1"
+
+    rows = await pool.fetch(
+        _JOB_LIST_SQL.format(where=where, offset=len(params) + 1, limit=len(params) + 2),
+        *params,
+        offset,
+        limit,
+    )
+    if rows:
+        total = rows[0]["total_count"]
+    elif offset:
+        # Paged past the end: no row to read the window total from
+        total = await pool.fetchval(_JOB_COUNT_SQL.format(where=where), *params) or 0
+    else:
+        total = 0
+
+    # Serialized here so FastAPI doesn't re-validate the constructed models
+    body = JobListResponse.model_construct(
+        jobs=[IndexingJobResponse.model_construct(**dict(r)) for r in rows],
         total=total,
     )
+    return Response(content=body.model_dump_json(by_alias=True), media_type="application/json")
 
 
 @router.get("/{job_id}", response_model=IndexingJobResponse)
 async def get_job_detail(
     job_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    pool: asyncpg.Pool = Depends(get_pg_pool),
 ):
     """Get details of a specific indexing job."""
-    result = await db.execute(select(IndexingJob).where(IndexingJob.id == job_id))
-    job = result.scalar_one_or_none()
+    job = await pool.fetchrow(_JOB_BY_ID_SQL, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    return IndexingJobResponse.model_validate(job)
+    return IndexingJobResponse.model_construct(**dict(job))
 
 
 @router.get("/{job_id}/progress", response_model=JobProgressResponse)
 async def get_job_progress(
     job_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    pool: asyncpg.Pool = Depends(get_pg_pool),
 ):
     """Get real-time progress for a specific indexing job."""
-    result = await db.execute(select(IndexingJob).where(IndexingJob.id == job_id))
-    job = result.scalar_one_or_none()
+    job = await pool.fetchrow(_JOB_PROGRESS_SQL, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    # Estimate time remaining based on processing rate
     eta = None
-    if job.status == "processing" and job.processed_files and job.started_at:
-        from datetime import datetime, timezone
-        elapsed = (datetime.now(timezone.utc) - job.started_at.replace(tzinfo=timezone.utc)).total_seconds()
-        if job.processed_files > 0 and elapsed > 0:
-            rate = job.processed_files / elapsed
-            remaining_files = (job.total_files or 0) - job.processed_files
-            if rate > 0:
-                remaining_seconds = remaining_files / rate
-                minutes = int(remaining_seconds // 60)
-                seconds = int(remaining_seconds % 60)
-                eta = f"{minutes}m {seconds}s" if minutes > 0 else f"{seconds}s"
-
-    return JobProgressResponse(
-        job_id=job.id,
-        status=job.status or "unknown",
-        progress_percent=job.progress_percent or 0,
-        total_files=job.total_files or 0,
-        processed_files=job.processed_files or 0,
-        failed_files=job.failed_files or 0,
-        current_file=job.current_file,
+    remaining_seconds = job["remaining_s"]
+    if remaining_seconds is not None:
+        minutes = int(remaining_seconds // 60)
+        seconds = int(remaining_seconds % 60)
+        eta = f"{minutes}m {seconds}s" if minutes > 0 else f"{seconds}s"
+
+    return JobProgressResponse.model_construct(
+        job_id=job["id"],
+        status=job["status"] or "unknown",
+        progress_percent=job["progress_percent"] or 0,
+        total_files=job["total_files"] or 0,
+        processed_files=job["processed_files"] or 0,
+        failed_files=job["failed_files"] or 0,
+        current_file=job["current_file"],
         estimated_time_remaining=eta,
     )
 
 
-@router.post("/{job_id}/cancel")
+@router.post("/{job_id}/cancel", response_model=JobCancelResponse)
 async def cancel_job(
     job_id: UUID,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """Request cancellation of an indexing job."""
-    result = await db.execute(select(IndexingJob).where(IndexingJob.id == job_id))
-    job = result.scalar_one_or_none()
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
-
-    if job.status not in ("pending", "processing"):
+    # Check and transition in one round-trip; only cancellable jobs match
+    result = await db.execute(_CANCEL_JOB, {"job_id": job_id})
+    if result.scalar_one_or_none() is None:
+        # Nothing updated: the job is missing or already finished
+        status = (await db.execute(_JOB_STATUS_BY_ID, {"job_id": job_id})).scalar_one_or_none()
+        if status is None:
+            raise HTTPException(status_code=404, detail="Job not found")
         raise HTTPException(
             status_code=400,
-            detail=f"Cannot cancel job with status '{job.status}'. Only pending or processing jobs can be cancelled.",
+            detail=f"Cannot cancel job with status '{status}'. Only pending or processing jobs can be cancelled.",
         )
-
-    job.status = "cancelled"
-    job.error_message = "Cancelled by user via dashboard"
     await db.commit()
 
-    # Broadcast cancellation via websocket
+    # Broadcast cancellation via websocket once the response has been sent
     from dashboard_backend.api.websocket import broadcast
-    await broadcast({
-        "type": "job_update",
-        "data": {
-            "job_id": str(job.id),
-            "status": "cancelled",
-            "message": "Job cancelled by user",
+
+    background_tasks.add_task(
+        broadcast,
+        {
+            "type": "job_update",
+            "data": {
+                "job_id": str(job_id),
+                "status": "cancelled",
+                "message": "Job cancelled by user",
+            },
         },
-    })
+    )
 
-    return {"message": "Job cancellation requested", "job_id": str(job_id)}
+    return JobCancelResponse(message="Job cancellation requested", job_id=job_id)
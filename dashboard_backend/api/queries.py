@@ -1,14 +1,13 @@
 """Query log endpoints for the dashboard."""
 
+import asyncio
+from datetime import timedelta
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import desc, func, text, case, literal
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
+import asyncpg
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
-from dashboard_backend.db import get_db
-from dashboard_backend.models import QueryLog
+from dashboard_backend.db import get_pg_pool
 from dashboard_backend.schemas import (
     PopularQuery,
     QueryListResponse,
@@ -20,6 +19,26 @@ from dashboard_backend.schemas import (
 
 router = APIRouter(prefix="/api/dashboard/queries", tags=["queries"])
 
+# Columns backing QueryLogResponse; the window count carries the unpaginated total
+_QUERY_LIST_SQL = """
+    SELECT id, query_text, response_text, sources, response_time_ms,
+           timestamp, client_type, session_id, count(*) OVER () AS total_count
+    FROM query_logs
+    {where}
+    ORDER BY timestamp DESC
+    OFFSET ${offset} LIMIT ${limit}
+"""
+
+_QUERY_COUNT_SQL = "SELECT count(*) FROM query_logs {where}"
+
+# Point select, prepared once per pooled connection by asyncpg's statement cache
+_QUERY_BY_ID_SQL = """
+    SELECT id, query_text, response_text, sources, response_time_ms,
+           timestamp, client_type, session_id
+    FROM query_logs
+    WHERE id = $1
+"""
+
 
 @router.get("", response_model=QueryListResponse)
 async def get_recent_queries(
@@ -28,115 +47,134 @@ async def get_recent_queries(
     search: str | None = Query(default=None),
     client_type: str | None = Query(default=None),
     time_range: str | None = Query(default=None, description="e.g. 1h, 24h, 7d, 30d"),
-    db: AsyncSession = Depends(get_db),
+    pool: asyncpg.Pool = Depends(get_pg_pool),
 ):
     """Get recent queries with optional filtering."""
-    query = select(QueryLog)
+    conditions: list[str] = []
+    params: list = []
 
     if search:
-        query = query.where(QueryLog.query_text.ilike(f"%{search}%"))
+        params.append(f"%{search}%")
+        conditions.append(f"query_text ILIKE ${len(params)}")
     if client_type:
-        query = query.where(QueryLog.client_type == client_type)
+        params.append(client_type)
+        conditions.append(f"client_type = ${len(params)}")
     if time_range:
         interval = _parse_time_range(time_range)
         if interval:
-            query = query.where(QueryLog.timestamp >= func.now() - text(f"interval '{interval}'"))
-
-    # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-
-    # Get paginated results
-    query = query.order_by(desc(QueryLog.timestamp)).offset(offset).limit(limit)
-    result = await db.execute(query)
-    rows = result.scalars().all()
-
-    return QueryListResponse(
-        queries=[QueryLogResponse.model_validate(r) for r in rows],
+            params.append(interval)
+            conditions.append(f"timestamp >= now() - ${len(params)}::interval")
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    rows = await pool.fetch(
+        _QUERY_LIST_SQL.format(where=where, offset=len(params) + 1, limit=len(params) + 2),
+        *params,
+        offset,
+        limit,
+    )
+    if rows:
+        total = rows[0]["total_count"]
+    elif offset:
+        # Paged past the end: no row to read the window total from
+        total = await pool.fetchval(_QUERY_COUNT_SQL.format(where=where), *params) or 0
+    else:
+        total = 0
+
+    # Serialized here so FastAPI doesn't re-validate the constructed models
+    body = QueryListResponse.model_construct(
+        queries=[QueryLogResponse.model_construct(**dict(r)) for r in rows],
         total=total,
         page=offset // limit + 1,
         page_size=limit,
     )
+    return Response(content=body.model_dump_json(), media_type="application/json")
+
+
+# Distribution labels paired with the bucket columns of the stats queries
+_RESPONSE_TIME_BUCKETS = (
+    ("<0.5s", "under_500"),
+    ("0.5-1s", "b500_1000"),
+    ("1-2s", "b1000_2000"),
+    ("2-5s", "b2000_5000"),
+    (">5s", "over_5000"),
+)
+
+# Basic stats and response time buckets in a single round-trip
+_STATS_SQL = """
+    SELECT
+        count(*) AS total,
+        avg(response_time_ms)::float8 AS avg_time,
+        percentile_cont(0.5) WITHIN GROUP (ORDER BY response_time_ms) AS median_time,
+        percentile_cont(0.95) WITHIN GROUP (ORDER BY response_time_ms) AS p95_time,
+        count(*) FILTER (WHERE response_time_ms < 500) AS under_500,
+        count(*) FILTER (WHERE response_time_ms BETWEEN 500 AND 999) AS b500_1000,
+        count(*) FILTER (WHERE response_time_ms BETWEEN 1000 AND 1999) AS b1000_2000,
+        count(*) FILTER (WHERE response_time_ms BETWEEN 2000 AND 4999) AS b2000_5000,
+        count(*) FILTER (WHERE response_time_ms >= 5000) AS over_5000
+    FROM query_logs
+    WHERE timestamp >= now() - $1::interval
+"""
+
+# Query trend, read from the trigger-maintained hourly histogram
+_TREND_SQL = """
+    SELECT bucket_hour AS bucket, total AS count
+    FROM query_log_buckets_hourly
+    WHERE bucket_hour >= date_trunc('hour', now() - $1::interval, 'UTC')
+    ORDER BY bucket_hour
+"""
+
+# Popular queries
+_POPULAR_SQL = """
+    SELECT query_text, count(*) AS count
+    FROM query_logs
+    WHERE timestamp >= now() - $1::interval
+    GROUP BY query_text
+    ORDER BY count DESC
+    LIMIT 10
+"""
 
 
 @router.get("/stats", response_model=QueryStatsResponse)
 async def get_query_statistics(
     time_range: str = Query(default="24h", description="e.g. 1h, 24h, 7d, 30d"),
-    db: AsyncSession = Depends(get_db),
+    pool: asyncpg.Pool = Depends(get_pg_pool),
 ):
     """Get query statistics and analytics for the given time range."""
-    interval = _parse_time_range(time_range) or "24 hours"
-    since = func.now() - text(f"interval '{interval}'")
-
-    # Basic stats
-    stats_query = select(
-        func.count(QueryLog.id).label("total"),
-        func.avg(QueryLog.response_time_ms).label("avg_time"),
-        func.percentile_cont(0.5).within_group(QueryLog.response_time_ms).label("median_time"),
-        func.percentile_cont(0.95).within_group(QueryLog.response_time_ms).label("p95_time"),
-    ).where(QueryLog.timestamp >= since)
-    stats_result = await db.execute(stats_query)
-    stats_row = stats_result.one()
-
-    # Query trend (hourly buckets)
-    trend_query = (
-        select(
-            func.date_trunc("hour", QueryLog.timestamp).label("bucket"),
-            func.count(QueryLog.id).label("count"),
-        )
-        .where(QueryLog.timestamp >= since)
-        .group_by(text("bucket"))
-        .order_by(text("bucket"))
+    interval = _parse_time_range(time_range) or timedelta(hours=24)
+
+    stats_row, trend_rows, popular_rows = await asyncio.gather(
+        pool.fetchrow(_STATS_SQL, interval),
+        pool.fetch(_TREND_SQL, interval),
+        pool.fetch(_POPULAR_SQL, interval),
     )
-    trend_result = await db.execute(trend_query)
+
     trend = [
-        QueryTrendPoint(timestamp=str(row.bucket), count=row.count)
-        for row in trend_result.all()
+        QueryTrendPoint.model_construct(timestamp=str(row["bucket"]), count=row["count"])
+        for row in trend_rows
     ]
-
-    # Popular queries
-    popular_query = (
-        select(
-            QueryLog.query_text,
-            func.count(QueryLog.id).label("count"),
-        )
-        .where(QueryLog.timestamp >= since)
-        .group_by(QueryLog.query_text)
-        .order_by(desc("count"))
-        .limit(10)
-    )
-    popular_result = await db.execute(popular_query)
     popular = [
-        PopularQuery(query_text=row.query_text, count=row.count)
-        for row in popular_result.all()
+        PopularQuery.model_construct(query_text=row["query_text"], count=row["count"])
+        for row in popular_rows
     ]
 
     # Response time distribution
-    total_count = stats_row.total or 1
-    buckets_query = select(
-        func.sum(case((QueryLog.response_time_ms < 500, 1), else_=0)).label("under_500"),
-        func.sum(case((QueryLog.response_time_ms.between(500, 999), 1), else_=0)).label("500_1000"),
-        func.sum(case((QueryLog.response_time_ms.between(1000, 1999), 1), else_=0)).label("1000_2000"),
-        func.sum(case((QueryLog.response_time_ms.between(2000, 4999), 1), else_=0)).label("2000_5000"),
-        func.sum(case((QueryLog.response_time_ms >= 5000, 1), else_=0)).label("over_5000"),
-    ).where(QueryLog.timestamp >= since)
-    buckets_result = await db.execute(buckets_query)
-    b = buckets_result.one()
-
+    total_count = stats_row["total"] or 1
     distribution = [
-        ResponseTimeBucket(bucket="<0.5s", count=b.under_500 or 0, percentage=round((b.under_500 or 0) / total_count * 100, 1)),
-        ResponseTimeBucket(bucket="0.5-1s", count=b[1] or 0, percentage=round((b[1] or 0) / total_count * 100, 1)),
-        ResponseTimeBucket(bucket="1-2s", count=b[2] or 0, percentage=round((b[2] or 0) / total_count * 100, 1)),
-        ResponseTimeBucket(bucket="2-5s", count=b[3] or 0, percentage=round((b[3] or 0) / total_count * 100, 1)),
-        ResponseTimeBucket(bucket=">5s", count=b[4] or 0, percentage=round((b[4] or 0) / total_count * 100, 1)),
+        ResponseTimeBucket.model_construct(
+            bucket=label,
+            count=stats_row[key],
+            percentage=round(stats_row[key] / total_count * 100, 1),
+        )
+        for label, key in _RESPONSE_TIME_BUCKETS
     ]
 
-    return QueryStatsResponse(
-        total_queries=stats_row.total or 0,
-        avg_response_time_ms=round(stats_row.avg_time, 1) if stats_row.avg_time else None,
-        median_response_time_ms=round(stats_row.median_time, 1) if stats_row.median_time else None,
-        p95_response_time_ms=round(stats_row.p95_time, 1) if stats_row.p95_time else None,
+    return QueryStatsResponse.model_construct(
+        total_queries=stats_row["total"],
+        avg_response_time_ms=round(stats_row["avg_time"], 1) if stats_row["avg_time"] else None,
+        median_response_time_ms=round(stats_row["median_time"], 1)
+        if stats_row["median_time"]
+        else None,
+        p95_response_time_ms=round(stats_row["p95_time"], 1) if stats_row["p95_time"] else None,
         query_trend=trend,
         popular_queries=popular,
         response_time_distribution=distribution,
@@ -146,25 +184,24 @@ async def get_query_statistics(
 @router.get("/{query_id}", response_model=QueryLogResponse)
 async def get_query_detail(
     query_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    pool: asyncpg.Pool = Depends(get_pg_pool),
 ):
     """Get details of a specific query by ID."""
-    result = await db.execute(select(QueryLog).where(QueryLog.id == query_id))
-    query_log = result.scalar_one_or_none()
+    query_log = await pool.fetchrow(_QUERY_BY_ID_SQL, query_id)
     if not query_log:
         raise HTTPException(status_code=404, detail="Query not found")
-    return QueryLogResponse.model_validate(query_log)
+    return QueryLogResponse.model_construct(**dict(query_log))
 
 
-def _parse_time_range(time_range: str) -> str | None:
-    """Convert shorthand time range to PostgreSQL interval string."""
+def _parse_time_range(time_range: str) -> timedelta | None:
+    """Convert shorthand time range to an interval."""
     mapping = {
-        "1h": "1 hour",
-        "6h": "6 hours",
-        "12h": "12 hours",
-        "24h": "24 hours",
-        "7d": "7 days",
-        "30d": "30 days",
-        "90d": "90 days",
+        "1h": timedelta(hours=1),
+        "6h": timedelta(hours=6),
+        "12h": timedelta(hours=12),
+        "24h": timedelta(hours=24),
+        "7d": timedelta(days=7),
+        "30d": timedelta(days=30),
+        "90d": timedelta(days=90),
     }
     return mapping.get(time_range)
@@ -1,22 +1,187 @@
 """Search endpoint that queries ChromaDB directly for RAG results."""
 
+import asyncio
 import logging
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Query
 from pydantic import BaseModel
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert
 
 from dashboard_backend.config import get_settings
-from dashboard_backend.db import get_db
+from dashboard_backend.db import async_session
 from dashboard_backend.models import QueryLog
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/dashboard/search", tags=["search"])
 
+# Persistent ChromaDB handles, created on first search and reused afterwards
+_client = None
+_collection = None
+_collection_lock = asyncio.Lock()
+
+
+async def _get_collection():
+    """Return the shared async collection handle, connecting on first use."""
+    global _client, _collection
+    if _collection is None:
+        async with _collection_lock:
+            if _collection is None:
+                import chromadb
+
+                settings = get_settings()
+                _client = await chromadb.AsyncHttpClient(
+                    host=settings.chroma_host, port=settings.chroma_port
+                )
+                _collection = await _client.get_or_create_collection(
+                    name=settings.chroma_collection,
+                    metadata={"hnsw:space": "ip"},
+                )
+    return _collection
+
+
+# Query embedding is CPU-bound, so it runs on a dedicated thread instead of
+# the event loop. Searches arriving within a few milliseconds of each other
+# are embedded together in one batch.
+_EMBED_BATCH_WINDOW = 0.005  # seconds
+_EMBED_MAX_BATCH = 32
+_embed_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search-embed")
+_embedding_function = None
+_embed_queue: asyncio.Queue | None = None
+_embed_worker: asyncio.Task | None = None
+
+
+class _StaticEmbeddingFunction:
+    """Unit-length query embeddings from a Model2Vec static model.
+
+    Matches the MCP server's ``model2vec`` backend, which indexes with the
+    same model and normalizes its embeddings.
+    """
+
+    def __init__(self, model_name: str):
+        from model2vec import StaticModel
+
+        self._model = StaticModel.from_pretrained(model_name)
+
+    def __call__(self, texts: list[str]):
+        import numpy as np
+
+        embeddings = self._model.encode(texts)
+        # Queries with only unknown tokens embed to zero; keep them finite
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        return embeddings / np.maximum(norms, 1e-12)
+
+
+def _get_embedding_function():
+    """Return the embedding function for the vectors the collection holds."""
+    global _embedding_function
+    if _embedding_function is None:
+        settings = get_settings()
+        if settings.embedding_backend == "model2vec":
+            _embedding_function = _StaticEmbeddingFunction(settings.static_embedding_model)
+        else:
+            from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
+            _embedding_function = DefaultEmbeddingFunction()
+    return _embedding_function
+
+
+async def _embed_query(text: str):
+    """Embed a single query, coalescing with other in-flight searches."""
+    global _embed_queue, _embed_worker
+    if _embed_worker is None or _embed_worker.done():
+        _embed_queue = asyncio.Queue()
+        _embed_worker = asyncio.create_task(_embed_batches(_embed_queue))
+    future = asyncio.get_running_loop().create_future()
+    await _embed_queue.put((text, future))
+    return await future
+
+
+async def _drain(queue: asyncio.Queue, max_items: int, window: float) -> list:
+    """Wait for one item, then collect more for up to ``window`` seconds."""
+    loop = asyncio.get_running_loop()
+    batch = [await queue.get()]
+    deadline = loop.time() + window
+    while len(batch) < max_items:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), remaining))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+async def _embed_batches(queue: asyncio.Queue):
+    """Drain queued queries in small batches and resolve their futures."""
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = await _drain(queue, _EMBED_MAX_BATCH, _EMBED_BATCH_WINDOW)
+        texts = [text for text, _ in batch]
+        try:
+            embeddings = await loop.run_in_executor(
+                _embed_executor, _get_embedding_function(), texts
+            )
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            continue
+
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+
+# Search queries are logged off the request path: rows are queued and a
+# single writer inserts them in multi-row batches.
+_LOG_BATCH_SIZE = 100
+_LOG_FLUSH_WINDOW = 0.2  # seconds
+_log_queue: asyncio.Queue | None = None
+_log_worker: asyncio.Task | None = None
+
+
+async def _enqueue_log(row: dict):
+    """Queue a QueryLog row for the background writer."""
+    global _log_queue, _log_worker
+    if _log_worker is None or _log_worker.done():
+        _log_queue = asyncio.Queue()
+        _log_worker = asyncio.create_task(_write_logs(_log_queue))
+    _log_queue.put_nowait(row)
+
+
+async def _write_logs(queue: asyncio.Queue):
+    """Insert queued QueryLog rows in batches until cancelled."""
+    while True:
+        batch = await _drain(queue, _LOG_BATCH_SIZE, _LOG_FLUSH_WINDOW)
+        try:
+            async with async_session() as session:
+                await session.execute(insert(QueryLog), batch)
+                await session.commit()
+        except Exception as exc:
+            logger.debug("Failed to log %d queries: %s", len(batch), exc)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+
+async def close_log_writer(timeout: float = 5.0):
+    """Flush pending query logs and stop the background writer."""
+    global _log_worker
+    if _log_worker is None:
+        return
+    try:
+        await asyncio.wait_for(_log_queue.join(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Dropping %d unwritten query logs", _log_queue.qsize())
+    _log_worker.cancel()
+    _log_worker = None
+
 
 class SearchResult(BaseModel):
     id: str
@@ -35,81 +200,62 @@ class SearchResponse(BaseModel):
 
 @router.get("", response_model=SearchResponse)
 async def search_documents(
+    background_tasks: BackgroundTasks,
     q: str = Query(..., description="Search query text"),
     top_k: int = Query(default=5, ge=1, le=20, description="Number of results"),
-    db: AsyncSession = Depends(get_db),
 ):
     """Search indexed documents using ChromaDB vector similarity."""
-    settings = get_settings()
+    global _collection
     start = time.time()
 
     try:
-        import chromadb
-
-        client = chromadb.HttpClient(
-            host=settings.chroma_host, port=settings.chroma_port
-        )
-        collection = client.get_or_create_collection(
-            name=settings.chroma_collection,
-            metadata={"hnsw:space": "cosine"},
-        )
+        collection = await _get_collection()
+        embedding = await _embed_query(q)
 
-        # ChromaDB's default embedding function handles embedding the query
-        results = collection.query(
-            query_texts=[q],
+        results = await collection.query(
+            query_embeddings=[embedding],
             n_results=top_k,
             include=["documents", "metadatas", "distances"],
         )
 
         hits: list[SearchResult] = []
         if results and results["ids"] and results["ids"][0]:
-            for i, doc_id in enumerate(results["ids"][0]):
-                hits.append(
-                    SearchResult(
-                        id=doc_id,
-                        text=results["documents"][0][i] if results["documents"] else "",
-                        source=(
-                            results["metadatas"][0][i].get("source", "unknown")
-                            if results["metadatas"]
-                            else "unknown"
-                        ),
-                        chunk_index=(
-                            results["metadatas"][0][i].get("chunk_index", 0)
-                            if results["metadatas"]
-                            else 0
-                        ),
-                        similarity=round(
-                            1 - (results["distances"][0][i] if results["distances"] else 0),
-                            4,
-                        ),
-                    )
+            ids = results["ids"][0]
+            docs = results["documents"][0] if results.get("documents") else [""] * len(ids)
+            metas = results["metadatas"][0] if results.get("metadatas") else [{}] * len(ids)
+            dists = results["distances"][0] if results.get("distances") else [0.0] * len(ids)
+            hits = [
+                SearchResult.model_construct(
+                    id=doc_id,
+                    text=doc,
+                    source=meta.get("source", "unknown"),
+                    chunk_index=meta.get("chunk_index", 0),
+                    similarity=round(1 - dist, 4),
                 )
+                for doc_id, doc, meta, dist in zip(ids, docs, metas, dists)
+            ]
 
         elapsed_ms = int((time.time() - start) * 1000)
 
-        # Log the query to the database
-        try:
-            sources_json = [
-                {"source": h.source, "chunk_index": h.chunk_index, "similarity": h.similarity}
-                for h in hits
-            ]
-            response_text = (
-                f"Found {len(hits)} results" if hits else "No results found"
-            )
-            query_log = QueryLog(
-                id=uuid.uuid4(),
-                query_text=q,
-                response_text=response_text,
-                sources=sources_json,
-                response_time_ms=elapsed_ms,
-                timestamp=datetime.now(timezone.utc),
-                client_type="dashboard",
-                session_id="dashboard",
-            )
-            db.add(query_log)
-            await db.commit()
-        except Exception as log_exc:
-            logger.debug("Failed to log query: %s", log_exc)
+        # Log the query to the database once the response has been sent
+        sources_json = [
+            {"source": h.source, "chunk_index": h.chunk_index, "similarity": h.similarity}
+            for h in hits
+        ]
+        response_text = f"Found {len(hits)} results" if hits else "No results found"
+        background_tasks.add_task(
+            _enqueue_log,
+            {
+                "id": uuid.uuid4(),
+                "query_text": q,
+                "response_text": response_text,
+                "sources": sources_json,
+                "response_time_ms": elapsed_ms,
+                "timestamp": datetime.now(timezone.utc),
+                "client_type": "dashboard",
+                "session_id": "dashboard",
+            },
+        )
 
         return SearchResponse(
             query=q,
@@ -119,6 +265,8 @@ async def search_documents(
         )
 
     except Exception as exc:
+        # Drop the cached handle so the next search reconnects
+        _collection = None
         elapsed_ms = int((time.time() - start) * 1000)
         logger.error("Search failed: %s", exc)
         return SearchResponse(
@@ -1,50 +1,153 @@
 """WebSocket endpoint for real-time dashboard updates."""
 
 import asyncio
-import json
 import logging
-from datetime import datetime, timezone
+import zlib
 
+import orjson
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from dashboard_backend.config import get_settings
+from dashboard_backend.fast_now import now_iso
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["websocket"])
 
 settings = get_settings()
 
+# Clients that can't take a frame within this many seconds are dropped
+_SEND_TIMEOUT = 5.0
+# Broadcast frames buffered per client before it is considered too slow
+_OUTBOX_SIZE = 256
+# Broadcasts are coalesced for this many seconds, up to this many messages per frame
+_BATCH_WINDOW = 0.01
+_BATCH_MAX_ITEMS = 200
+# Frames at least this large are zlib-compressed for clients that opted in
+_COMPRESS_MIN_BYTES = 1024
+
+# Fixed replies, pre-encoded; only the ISO timestamp (no JSON escapes) varies
+_CONNECTED_TEMPLATE = (
+    '{"type":"connected","data":{"message":"Connected to dashboard WebSocket","timestamp":"%s"}}'
+)
+_PONG_TEMPLATE = '{"type":"pong","data":{"timestamp":"%s"}}'
+_INVALID_JSON_REPLY = '{"type":"error","data":{"message":"Invalid JSON"}}'
+
 
 class ConnectionManager:
-    """Manages active WebSocket connections for real-time dashboard updates."""
+    """Manages active WebSocket connections for real-time dashboard updates.
+
+    Each client gets an outbound queue drained by its own writer task, so a
+    broadcast only enqueues the encoded frame and never waits on a socket.
+
+    Clients that subscribe with ``"compress": "zlib"`` receive large frames
+    as binary zlib data. The frame is compressed once and shared by all of
+    them, instead of permessage-deflate compressing it again per connection.
+    """
 
     def __init__(self):
-        self.active_connections: list[WebSocket] = []
+        self.active_connections: set[WebSocket] = set()
+        self._outboxes: dict[WebSocket, asyncio.Queue] = {}
+        self._writers: dict[WebSocket, asyncio.Task] = {}
+        self._zlib_clients: set[WebSocket] = set()
         self._lock = asyncio.Lock()
+        self._pending: list[dict] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
+        outbox = asyncio.Queue(maxsize=_OUTBOX_SIZE)
         async with self._lock:
-            self.active_connections.append(websocket)
+            self.active_connections.add(websocket)
+            self._outboxes[websocket] = outbox
+            self._writers[websocket] = asyncio.create_task(self._write_loop(websocket, outbox))
         logger.info("WebSocket client connected. Total: %d", len(self.active_connections))
 
     async def disconnect(self, websocket: WebSocket):
         async with self._lock:
-            if websocket in self.active_connections:
-                self.active_connections.remove(websocket)
+            self.active_connections.discard(websocket)
+            self._zlib_clients.discard(websocket)
+            self._outboxes.pop(websocket, None)
+            writer = self._writers.pop(websocket, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
         logger.info("WebSocket client disconnected. Total: %d", len(self.active_connections))
 
+    async def _write_loop(self, websocket: WebSocket, outbox: asyncio.Queue):
+        """Send queued frames to one client until it fails or is disconnected."""
+        try:
+            while True:
+                frame = await outbox.get()
+                if isinstance(frame, bytes):
+                    await asyncio.wait_for(websocket.send_bytes(frame), _SEND_TIMEOUT)
+                else:
+                    await asyncio.wait_for(websocket.send_text(frame), _SEND_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            await self.disconnect(websocket)
+
+    def enable_compression(self, websocket: WebSocket):
+        """Send this client's large broadcast frames zlib-compressed."""
+        if websocket in self.active_connections:
+            self._zlib_clients.add(websocket)
+
+    async def _evict(self, websocket: WebSocket):
+        """Drop a client whose outbox overflowed."""
+        await self.disconnect(websocket)
+        try:
+            await websocket.close(code=1013)  # Try again later
+        except Exception:
+            pass
+
     async def broadcast_json(self, message: dict):
-        """Send a JSON message to all connected clients."""
-        async with self._lock:
-            stale = []
-            for connection in self.active_connections:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    stale.append(connection)
-            for conn in stale:
-                self.active_connections.remove(conn)
+        """Queue a JSON message for all connected clients.
+
+        Messages broadcast within ``_BATCH_WINDOW`` of each other are sent
+        together as one ``batch`` frame.
+        """
+        self._pending.append(message)
+        if len(self._pending) >= _BATCH_MAX_ITEMS:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(_BATCH_WINDOW, self._flush)
+
+    def _flush(self):
+        """Encode pending messages into a single frame and queue it for every client."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        message = pending[0] if len(pending) == 1 else {"type": "batch", "items": pending}
+
+        # Encode (and compress) once for every client. Plain frames go out as
+        # text because the dashboard client JSON.parses event.data directly.
+        payload = orjson.dumps(message)
+        text = payload.decode()
+        compressed = None
+        if self._zlib_clients and len(payload) >= _COMPRESS_MIN_BYTES:
+            compressed = zlib.compress(payload, 1)
+        for websocket, outbox in list(self._outboxes.items()):
+            frame = (
+                compressed if compressed is not None and websocket in self._zlib_clients else text
+            )
+            self._enqueue(websocket, outbox, frame)
+
+    def send(self, websocket: WebSocket, frame: str):
+        """Queue a frame for one client, behind the frames already queued for it."""
+        outbox = self._outboxes.get(websocket)
+        if outbox is not None:
+            self._enqueue(websocket, outbox, frame)
+
+    def _enqueue(self, websocket: WebSocket, outbox: asyncio.Queue, frame: str | bytes):
+        try:
+            outbox.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Stop queueing for it right away; the close happens in the background
+            del self._outboxes[websocket]
+            logger.warning("WebSocket client too slow, disconnecting")
+            asyncio.create_task(self._evict(websocket))
 
 
 manager = ConnectionManager()
@@ -55,17 +158,24 @@ async def broadcast(message: dict):
     await manager.broadcast_json(message)
 
 
-async def _heartbeat(websocket: WebSocket):
-    """Send periodic heartbeats to keep the connection alive."""
-    try:
-        while True:
-            await asyncio.sleep(settings.ws_heartbeat_interval)
-            await websocket.send_json({
-                "type": "heartbeat",
-                "data": {"timestamp": datetime.now(timezone.utc).isoformat()},
-            })
-    except Exception:
-        pass  # Connection closed
+_heartbeat_task: asyncio.Task | None = None
+
+
+async def _heartbeat():
+    """Broadcast periodic heartbeats to keep connections alive.
+
+    One task serves every client, so each tick is built and encoded once.
+    It exits once no clients remain and is restarted by the next connection.
+    """
+    while manager.active_connections:
+        await asyncio.sleep(settings.ws_heartbeat_interval)
+        await manager.broadcast_json({"type": "heartbeat", "data": {"timestamp": now_iso()}})
+
+
+def _ensure_heartbeat():
+    global _heartbeat_task
+    if _heartbeat_task is None or _heartbeat_task.done():
+        _heartbeat_task = asyncio.create_task(_heartbeat())
 
 
 @router.websocket("/ws/dashboard")
@@ -77,39 +187,33 @@ async def dashboard_websocket(websocket: WebSocket):
     - job_update: Job status/progress changed
     - metric_update: New system metrics
     - heartbeat: Periodic keep-alive
+    - batch: Several of the above sent together, in ``items``
+
+    Sending ``{"type": "subscribe", "compress": "zlib"}`` switches large
+    broadcast frames to binary zlib-compressed JSON.
     """
     await manager.connect(websocket)
-    heartbeat_task = asyncio.create_task(_heartbeat(websocket))
+    _ensure_heartbeat()
 
     try:
-        # Send initial connection confirmation
-        await websocket.send_json({
-            "type": "connected",
-            "data": {
-                "message": "Connected to dashboard WebSocket",
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            },
-        })
+        # Replies go through the client's writer like broadcasts, so a slow
+        # client never blocks this receive loop
+        manager.send(websocket, _CONNECTED_TEMPLATE % now_iso())
 
         # Listen for client messages (e.g. subscribe/unsubscribe to specific events)
         while True:
             data = await websocket.receive_text()
             try:
-                msg = json.loads(data)
+                msg = orjson.loads(data)
                 msg_type = msg.get("type")
 
-                if msg_type == "ping":
-                    await websocket.send_json({
-                        "type": "pong",
-                        "data": {"timestamp": datetime.now(timezone.utc).isoformat()},
-                    })
-            except json.JSONDecodeError:
-                await websocket.send_json({
-                    "type": "error",
-                    "data": {"message": "Invalid JSON"},
-                })
+                if msg_type == "subscribe" and msg.get("compress") == "zlib":
+                    manager.enable_compression(websocket)
+                elif msg_type == "ping":
+                    manager.send(websocket, _PONG_TEMPLATE % now_iso())
+            except orjson.JSONDecodeError:
+                manager.send(websocket, _INVALID_JSON_REPLY)
     except WebSocketDisconnect:
         pass
     finally:
-        heartbeat_task.cancel()
         await manager.disconnect(websocket)
@@ -4,22 +4,44 @@ Connects to the same PostgreSQL database used by the MCP server.
 The dashboard backend performs read-only queries against the shared tables.
 """
 
+import json
+
+import asyncpg
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from dashboard_backend.config import get_settings
 
 settings = get_settings()
 
+# Short dashboard queries gain nothing from JIT compilation, only its startup cost
+_PG_SERVER_SETTINGS = {"jit": "off"}
+
+_connect_args = {}
+if make_url(settings.database_url).get_backend_name() == "postgresql":
+    _connect_args = {
+        # Reuse server-side prepared statements for the repeated dashboard queries
+        "statement_cache_size": 1024,
+        "prepared_statement_cache_size": 1024,
+        "server_settings": _PG_SERVER_SETTINGS,
+    }
+
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=20,
+    max_overflow=40,
     pool_pre_ping=True,
+    # Room for every statement variant the endpoints compile (filters, limits)
+    query_cache_size=2000,
+    connect_args=_connect_args,
 )
 
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Raw asyncpg pool for hot read-only queries; SQLAlchemy still handles writes.
+_pg_pool: asyncpg.Pool | None = None
+
 
 async def get_db() -> AsyncSession:
     """Dependency that yields an async database session."""
@@ -27,13 +49,45 @@ async def get_db() -> AsyncSession:
         yield session
 
 
+async def get_pg_pool() -> asyncpg.Pool:
+    """Dependency that returns the shared asyncpg pool."""
+    if _pg_pool is None:
+        raise RuntimeError("asyncpg pool is not initialised (requires a PostgreSQL database_url)")
+    return _pg_pool
+
+
+async def _init_pg_connection(conn: asyncpg.Connection):
+    # Decode JSON columns to Python objects like SQLAlchemy does
+    for typename in ("json", "jsonb"):
+        await conn.set_type_codec(
+            typename, encoder=json.dumps, decoder=json.loads, schema="pg_catalog"
+        )
+
+
 async def init_db():
     """Create tables if they don't exist (for development/testing)."""
+    global _pg_pool
     from dashboard_backend.models import Base
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
+    url = make_url(settings.database_url)
+    if url.get_backend_name() == "postgresql":
+        _pg_pool = await asyncpg.create_pool(
+            url.set(drivername="postgresql").render_as_string(hide_password=False),
+            min_size=10,
+            max_size=50,
+            max_inactive_connection_lifetime=300,
+            statement_cache_size=1024,
+            server_settings=_PG_SERVER_SETTINGS,
+            init=_init_pg_connection,
+        )
+
 
 async def close_db():
     """Dispose of the engine connection pool."""
+    global _pg_pool
+    if _pg_pool is not None:
+        await _pg_pool.close()
+        _pg_pool = None
     await engine.dispose()
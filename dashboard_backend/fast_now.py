@@ -0,0 +1,21 @@
+"""Cheap UTC timestamps for high-frequency messages."""
+
+import time
+from datetime import datetime, timezone
+
+# Timestamps reuse the last formatted value for this many seconds
+_MAX_AGE = 0.05
+
+_cached: tuple[float, str] = (0.0, "")
+
+
+def now_iso() -> str:
+    """Current UTC time in ISO format, reformatted at most every 50ms."""
+    global _cached
+    now = time.time()
+    if now - _cached[0] >= _MAX_AGE:
+        _cached = (
+            now,
+            datetime.fromtimestamp(now, tz=timezone.utc).isoformat(timespec="milliseconds"),
+        )
+    return _cached[1]
@@ -5,7 +5,8 @@ read-only access to query logs, indexing jobs, system health, and analytics
 from the shared PostgreSQL database used by the MCP server.
 
 Run with:
-    uvicorn dashboard_backend.main:app --host 0.0.0.0 --port 8001 --reload
+    uvicorn dashboard_backend.main:app --host 0.0.0.0 --port 8001 --loop uvloop --http httptools \
+        --ws-per-message-deflate false
 """
 
 import logging
@@ -34,9 +35,14 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Dashboard Backend on port %s", settings.port)
     await init_db()
     logger.info("Database initialized")
+    await health.create_analytics_function()
+    await health.start_pg_stat_refresh()
     yield
     # Shutdown
     logger.info("Shutting down Dashboard Backend")
+    await health.stop_pg_stat_refresh()
+    await health.close_http_client()
+    await search.close_log_writer()
     await close_db()
 
 
@@ -84,7 +90,7 @@ app.include_router(websocket.router)
 
 
 @app.get("/")
-async def root():
+async def root() -> dict:
     return {
         "service": "Epstein RAG Dashboard Backend",
         "version": "1.0.0",
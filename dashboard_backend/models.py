@@ -6,15 +6,17 @@ is not installed (e.g. during isolated testing).
 """
 
 import uuid
-from datetime import datetime, timezone
 
 from sqlalchemy import (
+    BigInteger,
     Column,
     DateTime,
     Float,
+    Index,
     Integer,
     String,
     Text,
+    func,
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import DeclarativeBase
@@ -25,29 +27,30 @@ class Base(DeclarativeBase):
 
 
 try:
-    from mcp_server.models import QueryLog, IndexingJob, SystemMetrics, Base  # noqa: F811
+    from mcp_server.models import QueryLog, IndexingJob, SystemMetrics, QueryLogBucketHourly, Base  # noqa: F811
 
     # Alias for consistent naming in dashboard code
     SystemMetric = SystemMetrics
 except ImportError:
+    # The dashboard image ships this module alone, so the trigger DDL has one copy
+    from mcp_server.query_log_buckets import install_query_log_buckets
+
     class QueryLog(Base):
         __tablename__ = "query_logs"
+        __table_args__ = (Index("ix_qlogs_client_ts", "client_type", "timestamp"),)
 
         id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
         query_text = Column(Text, nullable=False)
         response_text = Column(Text)
         sources = Column(JSONB)
         response_time_ms = Column(Integer)
-        timestamp = Column(
-            DateTime(timezone=True),
-            default=lambda: datetime.now(timezone.utc),
-            index=True,
-        )
+        timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
         client_type = Column(String(50), index=True)
         session_id = Column(String(100))
 
     class IndexingJob(Base):
         __tablename__ = "indexing_jobs"
+        __table_args__ = (Index("ix_jobs_status_started", "status", "started_at"),)
 
         id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
         source_type = Column(String(50))
@@ -65,16 +68,28 @@ except ImportError:
 
     class SystemMetrics(Base):
         __tablename__ = "system_metrics"
+        __table_args__ = (Index("ix_metrics_name_ts", "metric_name", "timestamp"),)
 
         id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-        timestamp = Column(
-            DateTime(timezone=True),
-            default=lambda: datetime.now(timezone.utc),
-            index=True,
-        )
+        timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
         metric_name = Column(String(100), index=True)
         metric_value = Column(Float)
         labels = Column(JSONB)
 
+    class QueryLogBucketHourly(Base):
+        __tablename__ = "query_log_buckets_hourly"
+
+        bucket_hour = Column(DateTime(timezone=True), primary_key=True)
+        total = Column(BigInteger, nullable=False, default=0)
+        timed = Column(BigInteger, nullable=False, default=0)
+        response_time_sum = Column(BigInteger, nullable=False, default=0)
+        under_500 = Column(BigInteger, nullable=False, default=0)
+        b500_1000 = Column(BigInteger, nullable=False, default=0)
+        b1000_2000 = Column(BigInteger, nullable=False, default=0)
+        b2000_5000 = Column(BigInteger, nullable=False, default=0)
+        over_5000 = Column(BigInteger, nullable=False, default=0)
+
+    install_query_log_buckets(QueryLogBucketHourly.__table__, QueryLog.__table__)
+
     # Alias for consistent naming
     SystemMetric = SystemMetrics
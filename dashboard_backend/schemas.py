@@ -96,6 +96,11 @@ class JobProgressResponse(BaseModel):
     estimated_time_remaining: str | None = None
 
 
+class JobCancelResponse(BaseModel):
+    message: str
+    job_id: UUID
+
+
 # --- Health Models ---
 
 class ComponentHealth(BaseModel):
@@ -9,6 +9,19 @@ export interface WebSocketMessage {
   data: unknown;
 }
 
+interface WebSocketBatch {
+  type: "batch";
+  items: WebSocketMessage[];
+}
+
+// Large broadcasts can be sent as zlib-compressed binary frames
+async function inflate(data: ArrayBuffer): Promise<string> {
+  const stream = new Blob([data])
+    .stream()
+    .pipeThrough(new DecompressionStream("deflate"));
+  return new Response(stream).text();
+}
+
 class DashboardWebSocket {
   private ws: WebSocket | null = null;
   private handlers: Map<string, Set<MessageHandler>> = new Map();
@@ -16,6 +29,8 @@ class DashboardWebSocket {
   private reconnectDelay = 1000;
   private maxReconnectDelay = 30000;
   private url: string;
+  // Frames are decoded in arrival order, even when some need inflating
+  private inbox: Promise<void> = Promise.resolve();
 
   constructor() {
     const protocol = window.location.protocol === "https:" ? "wss:" : "ws:";
@@ -27,9 +42,14 @@ class DashboardWebSocket {
 
     try {
       this.ws = new WebSocket(this.url);
+      this.ws.binaryType = "arraybuffer";
+      this.inbox = Promise.resolve();
 
       this.ws.onopen = () => {
         this.reconnectDelay = 1000;
+        if (typeof DecompressionStream !== "undefined") {
+          this.ws?.send(JSON.stringify({ type: "subscribe", compress: "zlib" }));
+        }
         this.emit("connection", {
           type: "metrics_update",
           data: { connected: true },
@@ -37,13 +57,21 @@ class DashboardWebSocket {
       };
 
       this.ws.onmessage = (event) => {
-        try {
-          const message: WebSocketMessage = JSON.parse(event.data);
-          this.emit(message.type, message);
-          this.emit("*", message);
-        } catch {
-          // ignore malformed messages
-        }
+        this.inbox = this.inbox
+          .then(async () => {
+            const raw =
+              typeof event.data === "string" ? event.data : await inflate(event.data);
+            const message: WebSocketMessage | WebSocketBatch = JSON.parse(raw);
+            // Broadcasts that fire close together arrive as a single batch frame
+            const messages = message.type === "batch" ? message.items : [message];
+            for (const item of messages) {
+              this.emit(item.type, item);
+              this.emit("*", item);
+            }
+          })
+          .catch(() => {
+            // ignore malformed messages
+          });
       };
 
       this.ws.onclose = () => {
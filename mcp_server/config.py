@@ -34,6 +34,30 @@ class Config:
         )
     )
 
+    # "onnx" runs a dynamically INT8-quantized ONNX export; "torch" the original model;
+    # "model2vec" the static model below instead, for fast CPU bulk indexing at
+    # some quality cost. Its vectors differ from the transformer's, so switching
+    # needs a fresh collection.
+    embedding_backend: str = field(default_factory=lambda: os.getenv("EMBEDDING_BACKEND", "onnx"))
+    static_embedding_model: str = field(
+        default_factory=lambda: os.getenv("STATIC_EMBEDDING_MODEL", "minishlab/potion-base-8M")
+    )
+    # ONNX Runtime quantization preset: arm64, avx2, avx512 or avx512_vnni
+    embedding_quantization: str = field(
+        default_factory=lambda: os.getenv("EMBEDDING_QUANTIZATION", "avx512_vnni")
+    )
+    # Run the PyTorch model in half precision when it is on a CUDA device
+    embedding_fp16: bool = field(
+        default_factory=lambda: os.getenv("EMBEDDING_FP16", "true").lower() in ("1", "true", "yes")
+    )
+    # Intra-op threads for the embedding model (PyTorch or ONNX Runtime);
+    # 0 keeps the library default. Lower it when several workers share a host.
+    torch_num_threads: int = field(default_factory=lambda: int(os.getenv("TORCH_NUM_THREADS", "0")))
+    embed_batch_size: int = field(default_factory=lambda: int(os.getenv("EMBED_BATCH_SIZE", "64")))
+    model_cache_dir: str = field(
+        default_factory=lambda: os.getenv("MODEL_CACHE_DIR", "data/models")
+    )
+
     # RAG settings
     chunk_size: int = field(
         default_factory=lambda: int(os.getenv("CHUNK_SIZE", "1000"))
@@ -41,9 +65,29 @@ class Config:
     chunk_overlap: int = field(
         default_factory=lambda: int(os.getenv("CHUNK_OVERLAP", "200"))
     )
+    # When set, chunks are windows of this many model tokens (capped at the
+    # model's max sequence length) instead of chunk_size characters
+    chunk_tokens: int = field(default_factory=lambda: int(os.getenv("CHUNK_TOKENS", "0")))
+    chunk_overlap_tokens: int = field(
+        default_factory=lambda: int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
+    )
     default_top_k: int = field(
         default_factory=lambda: int(os.getenv("DEFAULT_TOP_K", "5"))
     )
+    # Repeated queries are answered from memory for this long (0 entries disables)
+    query_cache_size: int = field(
+        default_factory=lambda: int(os.getenv("QUERY_CACHE_SIZE", "2000"))
+    )
+    query_cache_ttl: float = field(
+        default_factory=lambda: float(os.getenv("QUERY_CACHE_TTL", "300"))
+    )
+
+    # Count the collection before reset_index drops it (a full scan when large)
+    reset_report_count: bool = field(
+        default_factory=lambda: (
+            os.getenv("RESET_REPORT_COUNT", "false").lower() in ("1", "true", "yes")
+        )
+    )
 
     # Server
     server_name: str = field(
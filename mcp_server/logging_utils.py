@@ -1,18 +1,31 @@
 """Logging helpers that write MCP operations to PostgreSQL."""
 
+import asyncio
 import logging
 import time
 import uuid
-from datetime import datetime, timezone
 from typing import Any
 
 import psutil
-from sqlalchemy import func, select
+from sqlalchemy import func, insert, select, update
 
 from .models import IndexingJob, QueryLog, SystemMetrics, async_session
 
 logger = logging.getLogger(__name__)
 
+# cpu_percent(interval=None) reports usage since the previous call and never
+# sleeps; prime it so the first real sample has a baseline.
+psutil.cpu_percent(interval=None)
+
+
+# Query logs are written off the request path: log_query only queues the row
+# and a single writer task inserts queued rows in multi-row batches.
+_LOG_QUEUE_SIZE = 10000
+_LOG_BATCH_SIZE = 200
+_LOG_FLUSH_WINDOW = 0.2  # seconds
+_log_queue: asyncio.Queue | None = None
+_log_worker: asyncio.Task | None = None
+
 
 async def log_query(
     query_text: str,
@@ -22,24 +35,76 @@ async def log_query(
     client_type: str = "mcp",
     session_id: str | None = None,
 ) -> uuid.UUID:
-    """Log a query to the database and return its ID."""
+    """Queue a query for logging and return its ID."""
+    global _log_queue, _log_worker
+    if _log_worker is None or _log_worker.done():
+        _log_queue = asyncio.Queue(maxsize=_LOG_QUEUE_SIZE)
+        _log_worker = asyncio.create_task(_write_logs(_log_queue))
+
     query_id = uuid.uuid4()
-    async with async_session() as session:
-        log_entry = QueryLog(
-            id=query_id,
-            query_text=query_text,
-            response_text=response_text,
-            sources=sources,
-            response_time_ms=response_time_ms,
-            client_type=client_type,
-            session_id=session_id,
+    try:
+        _log_queue.put_nowait(
+            {
+                "id": query_id,
+                "query_text": query_text,
+                "response_text": response_text,
+                "sources": sources,
+                "response_time_ms": response_time_ms,
+                "client_type": client_type,
+                "session_id": session_id,
+            }
         )
-        session.add(log_entry)
-        await session.commit()
-    logger.info("Logged query %s: %s", query_id, query_text[:80])
+    except asyncio.QueueFull:
+        logger.warning("Query log queue full, dropping query %s", query_id)
+    else:
+        logger.info("Logged query %s: %s", query_id, query_text[:80])
     return query_id
 
 
+async def _next_log_batch(queue: asyncio.Queue) -> list[dict]:
+    """Wait for one row, then collect more for up to ``_LOG_FLUSH_WINDOW``."""
+    loop = asyncio.get_running_loop()
+    batch = [await queue.get()]
+    deadline = loop.time() + _LOG_FLUSH_WINDOW
+    while len(batch) < _LOG_BATCH_SIZE:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), remaining))
+        except asyncio.TimeoutError:
+            break
+    return batch
+
+
+async def _write_logs(queue: asyncio.Queue) -> None:
+    """Insert queued query logs in batches until cancelled."""
+    while True:
+        batch = await _next_log_batch(queue)
+        try:
+            async with async_session() as session:
+                await session.execute(insert(QueryLog), batch)
+                await session.commit()
+        except Exception as exc:
+            logger.error("Failed to write %d query logs: %s", len(batch), exc)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+
+async def close_log_writer(timeout: float = 5.0) -> None:
+    """Flush queued query logs and stop the background writer."""
+    global _log_worker
+    if _log_worker is None:
+        return
+    try:
+        await asyncio.wait_for(_log_queue.join(), timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Dropping %d unwritten query logs", _log_queue.qsize())
+    _log_worker.cancel()
+    _log_worker = None
+
+
 async def create_indexing_job(
     source_type: str,
     source_url: str,
@@ -75,77 +140,74 @@ async def update_indexing_job(
     error_message: str | None = None,
 ) -> None:
     """Update an existing indexing job's progress."""
-    async with async_session() as session:
-        result = await session.get(IndexingJob, job_id)
-        if result is None:
-            logger.warning("Indexing job %s not found", job_id)
-            return
-
-        if status is not None:
-            result.status = status
-            if status == "processing" and result.started_at is None:
-                result.started_at = datetime.now(timezone.utc)
-            elif status in ("completed", "failed"):
-                result.completed_at = datetime.now(timezone.utc)
-        if processed_files is not None:
-            result.processed_files = processed_files
-        if failed_files is not None:
-            result.failed_files = failed_files
-        if current_file is not None:
-            result.current_file = current_file
-        if progress_percent is not None:
-            result.progress_percent = progress_percent
-        if total_files is not None:
-            result.total_files = total_files
-        if error_message is not None:
-            result.error_message = error_message
+    fields = {
+        "status": status,
+        "processed_files": processed_files,
+        "failed_files": failed_files,
+        "current_file": current_file,
+        "progress_percent": progress_percent,
+        "total_files": total_files,
+        "error_message": error_message,
+    }
+    values = {name: value for name, value in fields.items() if value is not None}
+    if status == "processing":
+        # Keep the original start time if the job was already started
+        values["started_at"] = func.coalesce(IndexingJob.started_at, func.now())
+    elif status in ("completed", "failed"):
+        values["completed_at"] = func.now()
+    if not values:
+        return
 
+    async with async_session() as session:
+        # Single UPDATE without loading the row; an empty match means no such job
+        result = await session.execute(
+            update(IndexingJob).where(IndexingJob.id == job_id).values(values)
+        )
         await session.commit()
+    if result.rowcount == 0:
+        logger.warning("Indexing job %s not found", job_id)
 
 
 async def log_system_metrics() -> None:
     """Capture and store current system metrics."""
-    now = datetime.now(timezone.utc)
-    metrics = [
-        SystemMetrics(
-            timestamp=now,
-            metric_name="cpu_percent",
-            metric_value=psutil.cpu_percent(interval=0.1),
-            labels={"unit": "percent"},
-        ),
-        SystemMetrics(
-            timestamp=now,
-            metric_name="memory_percent",
-            metric_value=psutil.virtual_memory().percent,
-            labels={"unit": "percent"},
-        ),
-        SystemMetrics(
-            timestamp=now,
-            metric_name="disk_percent",
-            metric_value=psutil.disk_usage("/").percent,
-            labels={"unit": "percent"},
-        ),
+    disk = await asyncio.to_thread(psutil.disk_usage, "/")
+    rows = [
+        {
+            "metric_name": "cpu_percent",
+            "metric_value": psutil.cpu_percent(interval=None),
+            "labels": {"unit": "percent"},
+        },
+        {
+            "metric_name": "memory_percent",
+            "metric_value": psutil.virtual_memory().percent,
+            "labels": {"unit": "percent"},
+        },
+        {
+            "metric_name": "disk_percent",
+            "metric_value": disk.percent,
+            "labels": {"unit": "percent"},
+        },
     ]
+    # Rows take their timestamp from the server default, which is the same
+    # transaction time for all three samples
     async with async_session() as session:
-        session.add_all(metrics)
+        await session.execute(insert(SystemMetrics), rows)
         await session.commit()
 
 
 async def get_query_stats() -> dict:
     """Aggregate query statistics for the stats://queries resource."""
-    async with async_session() as session:
-        total = (await session.execute(select(func.count(QueryLog.id)))).scalar() or 0
-        avg_time = (
-            await session.execute(select(func.avg(QueryLog.response_time_ms)))
-        ).scalar()
-
-        recent = (
-            await session.execute(
-                select(QueryLog)
-                .order_by(QueryLog.timestamp.desc())
-                .limit(10)
-            )
-        ).scalars().all()
+    aggregates = select(func.count(QueryLog.id), func.avg(QueryLog.response_time_ms))
+    recent_query = select(QueryLog).order_by(QueryLog.timestamp.desc()).limit(10)
+
+    # Separate sessions so both queries are in flight at once
+    async with async_session() as agg_session, async_session() as recent_session:
+        agg_result, recent_result = await asyncio.gather(
+            agg_session.execute(aggregates),
+            recent_session.execute(recent_query),
+        )
+        total, avg_time = agg_result.one()
+        recent = recent_result.scalars().all()
 
         recent_list = [
             {
@@ -159,7 +221,7 @@ async def get_query_stats() -> dict:
         ]
 
     return {
-        "total_queries": total,
+        "total_queries": total or 0,
         "avg_response_time_ms": round(avg_time, 1) if avg_time else 0,
         "recent_queries": recent_list,
     }
@@ -168,20 +230,18 @@ async def get_query_stats() -> dict:
 async def get_job_stats() -> dict:
     """Aggregate indexing job statistics for the stats://jobs resource."""
     async with async_session() as session:
-        total = (
-            await session.execute(select(func.count(IndexingJob.id)))
-        ).scalar() or 0
-
-        by_status = {}
-        for status_val in ("pending", "processing", "completed", "failed"):
-            count = (
-                await session.execute(
-                    select(func.count(IndexingJob.id)).where(
-                        IndexingJob.status == status_val
-                    )
-                )
-            ).scalar() or 0
-            by_status[status_val] = count
+        # All status counts in one grouped scan; the total is their sum
+        status_counts = (
+            await session.execute(
+                select(IndexingJob.status, func.count(IndexingJob.id)).group_by(IndexingJob.status)
+            )
+        ).all()
+        total = sum(count for _, count in status_counts)
+
+        by_status = dict.fromkeys(("pending", "processing", "completed", "failed"), 0)
+        for status_val, count in status_counts:
+            if status_val in by_status:
+                by_status[status_val] = count
 
         active_jobs = (
             await session.execute(
@@ -214,7 +274,7 @@ async def get_job_stats() -> dict:
 async def get_system_stats() -> dict:
     """Gather live system health for the stats://system resource."""
     mem = psutil.virtual_memory()
-    disk = psutil.disk_usage("/")
+    disk = await asyncio.to_thread(psutil.disk_usage, "/")
     return {
         "status": "healthy",
         "components": {
@@ -223,7 +283,7 @@ async def get_system_stats() -> dict:
             "embedding_model": "ready",
         },
         "metrics": {
-            "cpu_percent": psutil.cpu_percent(interval=0.1),
+            "cpu_percent": psutil.cpu_percent(interval=None),
             "memory_used_gb": round(mem.used / (1024**3), 2),
             "memory_percent": mem.percent,
             "disk_used_gb": round(disk.used / (1024**3), 2),
@@ -1,21 +1,26 @@
 """SQLAlchemy models for query logs, indexing jobs, and system metrics."""
 
 import uuid
-from datetime import datetime, timezone
 
 from sqlalchemy import (
+    BigInteger,
     Column,
     DateTime,
     Float,
+    Index,
     Integer,
     String,
     Text,
+    func,
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.sql import text
 
 from .config import config
+from .query_log_buckets import install_query_log_buckets
 
 
 class Base(DeclarativeBase):
@@ -24,23 +29,21 @@ class Base(DeclarativeBase):
 
 class QueryLog(Base):
     __tablename__ = "query_logs"
+    __table_args__ = (Index("ix_qlogs_client_ts", "client_type", "timestamp"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     query_text = Column(Text, nullable=False)
     response_text = Column(Text)
     sources = Column(JSONB)  # [{"source": "file.pdf", "page": 5, "similarity": 0.89}]
     response_time_ms = Column(Integer)
-    timestamp = Column(
-        DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
-        index=True,
-    )
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     client_type = Column(String(50), index=True)  # "claude", "cursor", "dashboard", "api"
     session_id = Column(String(100))
 
 
 class IndexingJob(Base):
     __tablename__ = "indexing_jobs"
+    __table_args__ = (Index("ix_jobs_status_started", "status", "started_at"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     source_type = Column(String(50))  # "github", "upload", "local"
@@ -59,25 +62,89 @@ class IndexingJob(Base):
 
 class SystemMetrics(Base):
     __tablename__ = "system_metrics"
+    __table_args__ = (Index("ix_metrics_name_ts", "metric_name", "timestamp"),)
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    timestamp = Column(
-        DateTime(timezone=True),
-        default=lambda: datetime.now(timezone.utc),
-        index=True,
-    )
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     metric_name = Column(String(100), index=True)
     metric_value = Column(Float)
     labels = Column(JSONB)
 
 
+class QueryLogBucketHourly(Base):
+    """Per-hour query counts and response time histogram.
+
+    Maintained by a PostgreSQL trigger on ``query_logs`` so dashboard
+    analytics read one row per hour instead of scanning every query.
+    Query logs are append-only, so only inserts are tracked.
+    """
+
+    __tablename__ = "query_log_buckets_hourly"
+
+    bucket_hour = Column(DateTime(timezone=True), primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+    timed = Column(BigInteger, nullable=False, default=0)  # rows with a response time
+    response_time_sum = Column(BigInteger, nullable=False, default=0)
+    under_500 = Column(BigInteger, nullable=False, default=0)
+    b500_1000 = Column(BigInteger, nullable=False, default=0)
+    b1000_2000 = Column(BigInteger, nullable=False, default=0)
+    b2000_5000 = Column(BigInteger, nullable=False, default=0)
+    over_5000 = Column(BigInteger, nullable=False, default=0)
+
+
+install_query_log_buckets(QueryLogBucketHourly.__table__, QueryLog.__table__)
+
+
 # Async engine and session factory
 
-engine = create_async_engine(config.database_url, echo=False)
+_connect_args = {}
+if make_url(config.database_url).get_backend_name() == "postgresql":
+    _connect_args = {
+        # Reuse server-side prepared statements and skip JIT on short queries
+        "statement_cache_size": 1024,
+        "prepared_statement_cache_size": 1024,
+        "server_settings": {"jit": "off"},
+    }
+
+engine = create_async_engine(
+    config.database_url,
+    echo=False,
+    pool_size=20,
+    max_overflow=40,
+    pool_pre_ping=True,
+    connect_args=_connect_args,
+)
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+# Tables created before timestamps moved to a server-side default still need it
+_TIMESTAMP_DEFAULT_DDL = tuple(
+    f"ALTER TABLE {table} ALTER COLUMN timestamp SET DEFAULT now()"
+    for table in ("query_logs", "system_metrics")
+)
+
+# Composite indexes declared in __table_args__, which create_all only adds to
+# new tables. Built concurrently so live writers are not blocked.
+_COMPOSITE_INDEX_DDL = (
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_qlogs_client_ts"
+    " ON query_logs (client_type, timestamp)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_jobs_status_started"
+    " ON indexing_jobs (status, started_at)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_metrics_name_ts"
+    " ON system_metrics (metric_name, timestamp)",
+)
+
+
 async def init_db():
     """Create all tables if they don't exist."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        if conn.dialect.name == "postgresql":
+            for statement in _TIMESTAMP_DEFAULT_DDL:
+                await conn.execute(text(statement))
+
+    if engine.dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+        async with engine.execution_options(isolation_level="AUTOCOMMIT").connect() as conn:
+            for statement in _COMPOSITE_INDEX_DDL:
+                await conn.execute(text(statement))
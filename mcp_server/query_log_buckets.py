@@ -0,0 +1,74 @@
+"""Trigger-maintained hourly histogram of query logs (PostgreSQL only).
+
+Kept free of other mcp_server imports so the dashboard backend, which
+creates the same tables when it starts first, can ship and share it.
+"""
+
+from sqlalchemy import DDL, Table, event
+
+# Trigger and backfill for QueryLogBucketHourly (PostgreSQL only). Hours are
+# truncated in UTC so the buckets don't depend on the writer's session timezone.
+QUERY_LOG_BUCKET_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION query_log_bucket_hourly() RETURNS trigger AS $$
+    BEGIN
+        IF NEW.timestamp IS NULL THEN
+            RETURN NULL;
+        END IF;
+        INSERT INTO query_log_buckets_hourly AS b (
+            bucket_hour, total, timed, response_time_sum,
+            under_500, b500_1000, b1000_2000, b2000_5000, over_5000
+        ) VALUES (
+            date_trunc('hour', NEW.timestamp, 'UTC'),
+            1,
+            (NEW.response_time_ms IS NOT NULL)::int,
+            coalesce(NEW.response_time_ms, 0),
+            (NEW.response_time_ms < 500 IS TRUE)::int,
+            (NEW.response_time_ms BETWEEN 500 AND 999 IS TRUE)::int,
+            (NEW.response_time_ms BETWEEN 1000 AND 1999 IS TRUE)::int,
+            (NEW.response_time_ms BETWEEN 2000 AND 4999 IS TRUE)::int,
+            (NEW.response_time_ms >= 5000 IS TRUE)::int
+        )
+        ON CONFLICT (bucket_hour) DO UPDATE SET
+            total = b.total + EXCLUDED.total,
+            timed = b.timed + EXCLUDED.timed,
+            response_time_sum = b.response_time_sum + EXCLUDED.response_time_sum,
+            under_500 = b.under_500 + EXCLUDED.under_500,
+            b500_1000 = b.b500_1000 + EXCLUDED.b500_1000,
+            b1000_2000 = b.b1000_2000 + EXCLUDED.b1000_2000,
+            b2000_5000 = b.b2000_5000 + EXCLUDED.b2000_5000,
+            over_5000 = b.over_5000 + EXCLUDED.over_5000;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER query_logs_bucket_hourly
+    AFTER INSERT ON query_logs
+    FOR EACH ROW EXECUTE FUNCTION query_log_bucket_hourly()
+    """,
+    """
+    INSERT INTO query_log_buckets_hourly
+    SELECT
+        date_trunc('hour', timestamp, 'UTC'),
+        count(*),
+        count(response_time_ms),
+        coalesce(sum(response_time_ms), 0),
+        count(*) FILTER (WHERE response_time_ms < 500),
+        count(*) FILTER (WHERE response_time_ms BETWEEN 500 AND 999),
+        count(*) FILTER (WHERE response_time_ms BETWEEN 1000 AND 1999),
+        count(*) FILTER (WHERE response_time_ms BETWEEN 2000 AND 4999),
+        count(*) FILTER (WHERE response_time_ms >= 5000)
+    FROM query_logs
+    WHERE timestamp IS NOT NULL
+    GROUP BY 1
+    """,
+)
+
+
+def install_query_log_buckets(buckets: Table, query_logs: Table) -> None:
+    """Run QUERY_LOG_BUCKET_DDL whenever ``buckets`` is created."""
+    # Created after query_logs so the trigger has a table to attach to
+    buckets.add_is_dependent_on(query_logs)
+    for statement in QUERY_LOG_BUCKET_DDL:
+        event.listen(buckets, "after_create", DDL(statement).execute_if(dialect="postgresql"))
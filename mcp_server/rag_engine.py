@@ -1,16 +1,93 @@
 """RAG engine using ChromaDB for vector storage and sentence-transformers for embeddings."""
 
-import hashlib
+import asyncio
+import copy
 import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Iterator
 from pathlib import Path
 
 import chromadb
+import numpy as np
+import torch
+import xxhash
 from sentence_transformers import SentenceTransformer
 
 from .config import config
 
 logger = logging.getLogger(__name__)
 
+# The Chroma client's HTTP pool keeps idle connections this long (seconds), so
+# sparse queries reuse a connection instead of reconnecting; the pool is sized
+# for the worker threads that call it concurrently.
+_CHROMA_KEEPALIVE_SECS = 300.0
+_CHROMA_MAX_CONNECTIONS = 32
+
+# index_folder embeds and upserts chunks from several files together, this many at a time
+_FOLDER_BATCH_CHUNKS = 2048
+# Files read and chunked ahead of the one being indexed, each in a worker thread
+_READ_AHEAD = 8
+
+
+def _iter_supported(root: Path, extensions: set[str]) -> Iterator[Path]:
+    """Yield files under ``root`` with one of ``extensions``.
+
+    Walks with os.scandir so ignored entries never become Path objects and
+    file types come from the directory listing instead of extra stat calls.
+    Like rglob, symlinked directories are not followed and unreadable
+    directories are skipped.
+    """
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in extensions and entry.is_file():
+                        yield Path(entry.path)
+        except OSError as exc:
+            logger.warning("Skipping unreadable directory: %s", exc)
+
+
+class QueryCache:
+    """Thread-safe LRU cache whose entries expire after ``ttl_seconds``."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._max_size = max_size
+        self._ttl = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value) -> None:
+        if self._max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self._ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
 
 class RAGEngine:
     """Handles document indexing, embedding, and retrieval via ChromaDB."""
@@ -19,53 +96,180 @@ class RAGEngine:
         self._client: chromadb.ClientAPI | None = None
         self._collection: chromadb.Collection | None = None
         self._model: SentenceTransformer | None = None
+        # Results depend on the collection and are dropped whenever it changes;
+        # query embeddings only depend on the model.
+        self._result_cache = QueryCache(config.query_cache_size, config.query_cache_ttl)
+        self._embedding_cache = QueryCache(config.query_cache_size, config.query_cache_ttl)
+        # Known source names, loaded on first list_documents() and then kept
+        # in step with every upsert, delete and reset made through this engine
+        self._sources: set[str] | None = None
+        # Worker threads update _sources while list_documents reads it on the loop
+        self._sources_lock = threading.Lock()
+        # Blocking work runs in worker threads (see the async methods below).
+        # One encode at a time keeps concurrent calls from oversubscribing
+        # the CPU/GPU; lazy client setup must not race either.
+        self._encode_lock = threading.Lock()
+        self._init_lock = threading.RLock()
+        # Token-aware chunking (config.chunk_tokens > 0) state
+        self._chunk_tokenizer = None
+        self._chunk_tokenizer_checked = False
+        self._chunk_tokens = 0
+        self._tokenizer_lock = threading.RLock()
 
     # -- Lazy initialisation --------------------------------------------------
 
     def _get_client(self) -> chromadb.ClientAPI:
-        if self._client is None:
-            self._client = chromadb.HttpClient(
-                host=config.chroma_host,
-                port=config.chroma_port,
-            )
-            logger.info(
-                "Connected to ChromaDB at %s:%s",
-                config.chroma_host,
-                config.chroma_port,
-            )
+        with self._init_lock:
+            if self._client is None:
+                self._client = chromadb.HttpClient(
+                    host=config.chroma_host,
+                    port=config.chroma_port,
+                    settings=chromadb.config.Settings(
+                        chroma_http_keepalive_secs=_CHROMA_KEEPALIVE_SECS,
+                        chroma_http_max_connections=_CHROMA_MAX_CONNECTIONS,
+                        chroma_http_max_keepalive_connections=_CHROMA_MAX_CONNECTIONS,
+                    ),
+                )
+                logger.info(
+                    "Connected to ChromaDB at %s:%s",
+                    config.chroma_host,
+                    config.chroma_port,
+                )
         return self._client
 
     def _get_collection(self) -> chromadb.Collection:
-        if self._collection is None:
-            client = self._get_client()
-            self._collection = client.get_or_create_collection(
-                name=config.chroma_collection,
-                metadata={"hnsw:space": "cosine"},
-            )
-            logger.info("Using collection '%s'", config.chroma_collection)
-        return self._collection
+        with self._init_lock:
+            if self._collection is None:
+                client = self._get_client()
+                # Embeddings are unit length (see _encode), so inner product
+                # ranks like cosine without per-vector normalization in Chroma.
+                # Collections created earlier keep cosine, which ranks the same.
+                self._collection = client.get_or_create_collection(
+                    name=config.chroma_collection,
+                    metadata={"hnsw:space": "ip"},
+                )
+                logger.info("Using collection '%s'", config.chroma_collection)
+            return self._collection
 
     def _get_model(self) -> SentenceTransformer:
         if self._model is None:
-            self._model = SentenceTransformer(config.embedding_model)
-            logger.info("Loaded embedding model '%s'", config.embedding_model)
+            if config.torch_num_threads > 0:
+                torch.set_num_threads(config.torch_num_threads)
+                try:
+                    torch.set_num_interop_threads(1)
+                except RuntimeError:
+                    # Only allowed before any inter-op parallel work has run
+                    pass
+            if config.embedding_backend == "model2vec":
+                # Static token embeddings mean-pooled, with no attention layers
+                # to run. Queries must use it too to share its vector space.
+                self._model = SentenceTransformer(config.static_embedding_model)
+            # The INT8 export targets CPU instruction sets; GPUs run the PyTorch model
+            elif config.embedding_backend == "onnx" and not torch.cuda.is_available():
+                try:
+                    self._model = self._load_quantized_model()
+                except Exception as exc:
+                    logger.warning("INT8 ONNX model unavailable, using PyTorch: %s", exc)
+            if self._model is None:
+                self._model = SentenceTransformer(config.embedding_model)
+                if config.embedding_fp16 and self._model.device.type == "cuda":
+                    # _encode() upcasts its output back to float32
+                    self._model.half()
+            logger.info("Loaded embedding model '%s'", self.model_name)
         return self._model
 
+    @property
+    def model_name(self) -> str:
+        """Name of the embedding model in use."""
+        if config.embedding_backend == "model2vec":
+            return config.static_embedding_model
+        return config.embedding_model
+
+    def _load_quantized_model(self) -> SentenceTransformer:
+        """Load the INT8 ONNX export of the embedding model, creating it on first use."""
+        model_dir = Path(config.model_cache_dir) / config.embedding_model.replace("/", "__")
+        pattern = f"model_*_{config.embedding_quantization}.onnx"
+        exported = sorted((model_dir / "onnx").glob(pattern))
+        if not exported:
+            from sentence_transformers import export_dynamic_quantized_onnx_model
+
+            onnx_model = SentenceTransformer(config.embedding_model, backend="onnx")
+            onnx_model.save(str(model_dir))
+            export_dynamic_quantized_onnx_model(
+                onnx_model, config.embedding_quantization, str(model_dir)
+            )
+            exported = sorted((model_dir / "onnx").glob(pattern))
+            logger.info("Exported quantized ONNX model to %s", model_dir)
+        model_kwargs = {"file_name": exported[0].name}
+        if config.torch_num_threads > 0:
+            import onnxruntime
+
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = config.torch_num_threads
+            session_options.inter_op_num_threads = 1
+            model_kwargs["session_options"] = session_options
+        return SentenceTransformer(
+            str(model_dir),
+            backend="onnx",
+            model_kwargs=model_kwargs,
+        )
+
+    def _encode(self, texts: list[str]) -> np.ndarray:
+        """Embed texts in one encode call, as unit-length float32 ``(len(texts), dim)`` rows.
+
+        encode() orders its inputs by length before batching and restores the
+        original order afterwards, so each batch pads only to similar lengths.
+        Passing many texts per call is what lets that bucketing pay off.
+
+        The array is handed to Chroma as is; converting it to nested Python
+        lists would box every float. encode() is asked for a tensor so the
+        rows are stacked into one buffer on the model's device and copied to
+        the host once, instead of being gathered row by row into numpy.
+        """
+        with self._encode_lock:
+            model = self._get_model()
+            embeddings = model.encode(
+                texts,
+                batch_size=config.embed_batch_size,
+                show_progress_bar=False,
+                convert_to_tensor=True,
+                normalize_embeddings=True,
+            )
+        return embeddings.float().cpu().numpy()
+
+    def _encode_chunks(self, chunks: list[dict]) -> np.ndarray:
+        """Embed chunk texts, running each distinct text through the model once.
+
+        Duplicate files and repeated boilerplate produce identical chunks;
+        their rows are copied from the first occurrence's embedding.
+        """
+        rows: dict[str, int] = {}
+        unique: list[str] = []
+        index = np.empty(len(chunks), dtype=np.intp)
+        for i, c in enumerate(chunks):
+            row = rows.setdefault(c["text"], len(unique))
+            if row == len(unique):
+                unique.append(c["text"])
+            index[i] = row
+        embeddings = self._encode(unique)
+        return embeddings if len(unique) == len(chunks) else embeddings[index]
+
     # -- Text chunking --------------------------------------------------------
 
     def _chunk_text(self, text: str, source: str) -> list[dict]:
         """Split text into overlapping chunks with metadata."""
+        spans = self._token_spans(text) if config.chunk_tokens > 0 else None
+        if spans is None:
+            size = config.chunk_size
+            step = size - config.chunk_overlap
+            spans = [(start, min(start + size, len(text))) for start in range(0, len(text), step)]
+
         chunks: list[dict] = []
-        size = config.chunk_size
-        overlap = config.chunk_overlap
-        start = 0
-        idx = 0
-        while start < len(text):
-            end = min(start + size, len(text))
+        for idx, (start, end) in enumerate(spans):
             chunk_text = text[start:end]
-            chunk_id = hashlib.sha256(
-                f"{source}:{idx}:{chunk_text[:64]}".encode()
-            ).hexdigest()[:16]
+            # Internal 64-bit ID, so a fast non-cryptographic hash is enough.
+            # It covers the whole chunk, so an unchanged ID means unchanged text.
+            chunk_id = xxhash.xxh3_64_hexdigest(f"{source}:{idx}:{chunk_text}".encode())
             chunks.append(
                 {
                     "id": f"{source}_{chunk_id}",
@@ -78,64 +282,210 @@ class RAGEngine:
                     },
                 }
             )
-            start += size - overlap
-            idx += 1
         return chunks
 
+    def _token_spans(self, text: str) -> list[tuple[int, int]] | None:
+        """Character spans of overlapping ``config.chunk_tokens``-token windows.
+
+        The document is tokenized once with the embedding model's tokenizer
+        and windows end on token boundaries, so no chunk splits a word
+        piece or runs past what the model can encode. Returns None when the
+        tokenizer cannot report character offsets.
+        """
+        tokenizer = self._get_chunk_tokenizer()
+        if tokenizer is None:
+            return None
+        with self._tokenizer_lock:
+            offsets = tokenizer(
+                text,
+                add_special_tokens=False,
+                return_offsets_mapping=True,
+                return_attention_mask=False,
+                return_token_type_ids=False,
+            )["offset_mapping"]
+        size = self._chunk_tokens
+        step = max(size - config.chunk_overlap_tokens, 1)
+        return [
+            (offsets[start][0], offsets[min(start + size, len(offsets)) - 1][1])
+            for start in range(0, len(offsets), step)
+        ]
+
+    def _get_chunk_tokenizer(self):
+        """A private copy of the model's fast tokenizer, used for chunking.
+
+        Chunking runs in read-ahead threads while encode() uses the model's
+        own tokenizer, so it gets a separate instance.
+        """
+        with self._tokenizer_lock:
+            if not self._chunk_tokenizer_checked:
+                self._chunk_tokenizer_checked = True
+                with self._encode_lock:
+                    model = self._get_model()
+                if not getattr(model.tokenizer, "is_fast", False):
+                    logger.warning("Tokenizer has no offset mapping, chunking by characters")
+                    return None
+                tokenizer = copy.deepcopy(model.tokenizer)
+                # Whole documents are tokenized on purpose; skip the too-long warning
+                tokenizer.model_max_length = sys.maxsize
+                # Leave room for the special tokens encode() adds
+                self._chunk_tokens = min(config.chunk_tokens, model.max_seq_length - 2)
+                self._chunk_tokenizer = tokenizer
+            return self._chunk_tokenizer
+
     # -- Indexing --------------------------------------------------------------
 
-    async def index_file(self, file_path: str) -> int:
-        """Read, chunk, embed, and store a single file. Returns chunk count."""
-        path = Path(file_path)
+    def _prepare_chunks(self, path: Path) -> list[dict]:
+        """Read and chunk one file without embedding it."""
         if not path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
+            raise FileNotFoundError(f"File not found: {path}")
 
         text = path.read_text(encoding="utf-8", errors="replace")
         if not text.strip():
-            return 0
-
+            return []
         chunks = self._chunk_text(text, path.name)
-        if not chunks:
-            return 0
+        # Sources are bare file names, so files in different folders can share
+        # one; the resolved path tells their chunks apart (see _drop_indexed)
+        file_key = str(path.resolve())
+        for c in chunks:
+            c["metadata"]["path"] = file_key
+        return chunks
 
-        model = self._get_model()
-        texts = [c["text"] for c in chunks]
-        embeddings = model.encode(texts, show_progress_bar=False).tolist()
+    def _drop_indexed(self, chunks: list[dict]) -> list[dict]:
+        """Return the chunks whose IDs are not in the collection yet.
 
+        IDs hash the chunk text, so these are the only chunks that need
+        embedding when a file is indexed again. Stored chunks of the same
+        files whose IDs did not come up again hold text the files no longer
+        contain, and are deleted; callers therefore pass all chunks of a file
+        together. Files are matched on the ``path`` metadata, not ``source``,
+        so same-named files elsewhere keep their chunks.
+        """
+        collection = self._get_collection()
+        ids = {c["id"] for c in chunks}
+        paths = sorted({c["metadata"]["path"] for c in chunks})
+        where = {"path": paths[0]} if len(paths) == 1 else {"path": {"$in": paths}}
+        stored = collection.get(where=where, include=[])["ids"]
+        stale = [i for i in stored if i not in ids]
+        if stale:
+            collection.delete(ids=stale)
+            self._result_cache.clear()
+            logger.info("Deleted %d outdated chunks", len(stale))
+        existing = ids.intersection(stored)
+        if not existing:
+            return chunks
+        return [c for c in chunks if c["id"] not in existing]
+
+    def _store(self, chunks: list[dict], embeddings: np.ndarray) -> None:
+        """Upsert chunks and their embeddings into the collection."""
         collection = self._get_collection()
         collection.upsert(
             ids=[c["id"] for c in chunks],
-            documents=texts,
+            documents=[c["text"] for c in chunks],
             metadatas=[c["metadata"] for c in chunks],
             embeddings=embeddings,
         )
-        logger.info("Indexed %d chunks from %s", len(chunks), path.name)
+        self._result_cache.clear()
+        with self._sources_lock:
+            if self._sources is not None:
+                self._sources.update(c["metadata"]["source"] for c in chunks)
+
+    def _index_chunks(self, chunks: list[dict]) -> int:
+        """Embed and store the chunks not indexed yet. Returns how many were new."""
+        new_chunks = self._drop_indexed(chunks)
+        if new_chunks:
+            self._store(new_chunks, self._encode_chunks(new_chunks))
+        return len(new_chunks)
+
+    async def _read_ahead(
+        self, files: list[Path]
+    ) -> AsyncIterator[tuple[Path, list[dict] | None, Exception | None]]:
+        """Yield ``(path, chunks, error)`` in order while later files load in threads."""
+        in_flight: deque[tuple[Path, asyncio.Future]] = deque()
+        remaining = iter(files)
+
+        def schedule() -> None:
+            f = next(remaining, None)
+            if f is not None:
+                future = asyncio.ensure_future(asyncio.to_thread(self._prepare_chunks, f))
+                in_flight.append((f, future))
+
+        for _ in range(_READ_AHEAD):
+            schedule()
+        while in_flight:
+            f, future = in_flight.popleft()
+            schedule()
+            try:
+                yield f, await future, None
+            except Exception as exc:
+                yield f, None, exc
+
+    async def index_file(self, file_path: str) -> int:
+        """Read, chunk, embed, and store a single file. Returns chunk count."""
+        path = Path(file_path)
+        chunks = await asyncio.to_thread(self._prepare_chunks, path)
+        if not chunks:
+            return 0
+
+        new = await asyncio.to_thread(self._index_chunks, chunks)
+        logger.info(
+            "Indexed %d chunks from %s (%d already indexed)",
+            len(chunks),
+            path.name,
+            len(chunks) - new,
+        )
         return len(chunks)
 
     async def index_folder(self, folder_path: str) -> dict:
-        """Index all supported files in a folder. Returns summary dict."""
+        """Index all supported files in a folder. Returns summary dict.
+
+        Chunks from consecutive files are pooled until there are
+        ``_FOLDER_BATCH_CHUNKS`` of them, then embedded in a single encode
+        call and stored in a single upsert. Chunks already in the collection
+        are skipped.
+        """
         supported_ext = {".txt", ".md", ".pdf", ".csv", ".json", ".log"}
         folder = Path(folder_path)
         if not folder.is_dir():
             raise NotADirectoryError(f"Not a directory: {folder_path}")
 
-        files = [
-            f for f in folder.rglob("*") if f.is_file() and f.suffix.lower() in supported_ext
-        ]
+        files = await asyncio.to_thread(list, _iter_supported(folder, supported_ext))
         total_chunks = 0
         processed = 0
         failed = 0
         errors: list[str] = []
 
-        for f in files:
+        pending: list[tuple[Path, list[dict]]] = []
+        pending_chunks = 0
+
+        async def flush() -> None:
+            nonlocal total_chunks, processed, failed, pending_chunks
+            chunks = [c for _, file_chunks in pending for c in file_chunks]
             try:
-                n = await self.index_file(str(f))
-                total_chunks += n
-                processed += 1
+                if chunks:
+                    # Later files keep loading in the read-ahead threads meanwhile
+                    await asyncio.to_thread(self._index_chunks, chunks)
+                total_chunks += len(chunks)
+                processed += len(pending)
             except Exception as exc:
+                for f, _ in pending:
+                    failed += 1
+                    errors.append(f"{f.name}: {exc}")
+                logger.warning("Failed to index %d files: %s", len(pending), exc)
+            pending.clear()
+            pending_chunks = 0
+
+        async for f, chunks, exc in self._read_ahead(files):
+            if exc is not None:
                 failed += 1
                 errors.append(f"{f.name}: {exc}")
                 logger.warning("Failed to index %s: %s", f.name, exc)
+                continue
+            pending.append((f, chunks))
+            pending_chunks += len(chunks)
+            if pending_chunks >= _FOLDER_BATCH_CHUNKS:
+                await flush()
+        if pending:
+            await flush()
 
         return {
             "total_files": len(files),
@@ -149,69 +499,105 @@ class RAGEngine:
 
     async def query(self, query_text: str, top_k: int | None = None) -> list[dict]:
         """Embed query and retrieve top-k similar chunks."""
+        return (await self.query_batch([query_text], top_k))[0]
+
+    async def query_batch(
+        self, query_texts: list[str], top_k: int | None = None
+    ) -> list[list[dict]]:
+        """Retrieve top-k chunks for several queries at once.
+
+        Queries not already cached are embedded in one encode call and sent
+        to Chroma in one request. Results come back in ``query_texts`` order.
+        """
         k = top_k or config.default_top_k
-        model = self._get_model()
-        embedding = model.encode([query_text], show_progress_bar=False).tolist()[0]
+        cached = [self._result_cache.get((q, k)) for q in query_texts]
+        missing = list(dict.fromkeys(q for q, hits in zip(query_texts, cached) if hits is None))
+
+        fresh = await asyncio.to_thread(self._query_uncached, missing, k) if missing else {}
+        return [
+            list(hits) if hits is not None else list(fresh[q])
+            for q, hits in zip(query_texts, cached)
+        ]
+
+    def _query_uncached(self, query_texts: list[str], k: int) -> dict[str, list[dict]]:
+        """Embed and search distinct uncached queries, caching their hits."""
+        embeddings = {q: self._embedding_cache.get(q) for q in query_texts}
+        to_embed = [q for q, embedding in embeddings.items() if embedding is None]
+        if to_embed:
+            for q, embedding in zip(to_embed, self._encode(to_embed)):
+                embeddings[q] = embedding
+                self._embedding_cache.put(q, embedding)
 
         collection = self._get_collection()
         results = collection.query(
-            query_embeddings=[embedding],
+            query_embeddings=np.stack([embeddings[q] for q in query_texts]),
             n_results=k,
             include=["documents", "metadatas", "distances"],
         )
-
-        hits: list[dict] = []
-        if results and results["ids"] and results["ids"][0]:
-            for i, doc_id in enumerate(results["ids"][0]):
-                hits.append(
-                    {
-                        "id": doc_id,
-                        "text": results["documents"][0][i] if results["documents"] else "",
-                        "source": (
-                            results["metadatas"][0][i].get("source", "unknown")
-                            if results["metadatas"]
-                            else "unknown"
-                        ),
-                        "chunk_index": (
-                            results["metadatas"][0][i].get("chunk_index", 0)
-                            if results["metadatas"]
-                            else 0
-                        ),
-                        "similarity": round(
-                            1 - (results["distances"][0][i] if results["distances"] else 0),
-                            4,
-                        ),
-                    }
-                )
-        return hits
+        fresh = {}
+        for j, q in enumerate(query_texts):
+            fresh[q] = self._parse_hits(results, j)
+            self._result_cache.put((q, k), tuple(fresh[q]))
+        return fresh
+
+    @staticmethod
+    def _parse_hits(results: dict, j: int) -> list[dict]:
+        """Convert the ``j``-th query of a Chroma query response into hit dicts."""
+        if not results or not results["ids"] or not results["ids"][j]:
+            return []
+        ids = results["ids"][j]
+        docs = results["documents"][j] if results["documents"] else [""] * len(ids)
+        metas = results["metadatas"][j] if results["metadatas"] else [{}] * len(ids)
+        dists = results["distances"][j] if results["distances"] else [0.0] * len(ids)
+        return [
+            {
+                "id": doc_id,
+                "text": doc,
+                "source": meta.get("source", "unknown"),
+                "chunk_index": meta.get("chunk_index", 0),
+                "similarity": round(1 - dist, 4),
+            }
+            for doc_id, doc, meta, dist in zip(ids, docs, metas, dists)
+        ]
 
     async def search_similar(self, query_text: str, top_k: int | None = None) -> list[dict]:
         """Alias for query - returns raw similarity results."""
         return await self.query(query_text, top_k)
 
     # -- Document management ---------------------------------------------------
+    #
+    # Each public coroutine runs its Chroma calls in a worker thread through
+    # the synchronous helper of the same name.
 
     async def get_document_summary(self, source: str) -> dict:
         """Get metadata summary for a given source document."""
+        return await asyncio.to_thread(self._get_document_summary, source)
+
+    def _get_document_summary(self, source: str) -> dict:
         collection = self._get_collection()
-        results = collection.get(
-            where={"source": source},
-            include=["metadatas", "documents"],
-        )
-        if not results or not results["ids"]:
+        # IDs alone for the count, then a single chunk's text for the preview
+        ids = collection.get(where={"source": source}, include=[])["ids"]
+        if not ids:
             return {"source": source, "found": False, "chunks": 0}
 
-        chunks = results["documents"] or []
+        first = collection.get(where={"source": source}, limit=1, include=["documents"])
+        chunks = first["documents"] or []
         preview = chunks[0][:500] if chunks else ""
         return {
             "source": source,
             "found": True,
-            "chunks": len(results["ids"]),
+            "chunks": len(ids),
             "preview": preview,
         }
 
     async def list_documents(self) -> list[str]:
         """List all unique source document names in the collection."""
+        if self._sources is None:
+            await asyncio.to_thread(self._load_sources)
+        with self._sources_lock:
+            return sorted(self._sources)
+
+    def _load_sources(self) -> None:
         collection = self._get_collection()
         all_data = collection.get(include=["metadatas"])
         sources: set[str] = set()
@@ -220,39 +606,63 @@ class RAGEngine:
                 src = meta.get("source")
                 if src:
                     sources.add(src)
-        return sorted(sources)
+        with self._sources_lock:
+            self._sources = sources
 
     async def delete_document(self, source: str) -> int:
         """Delete all chunks belonging to a source document. Returns count deleted."""
+        return await asyncio.to_thread(self._delete_document, source)
+
+    def _delete_document(self, source: str) -> int:
         collection = self._get_collection()
         existing = collection.get(where={"source": source})
         if not existing or not existing["ids"]:
             return 0
         ids_to_delete = existing["ids"]
         collection.delete(ids=ids_to_delete)
+        self._result_cache.clear()
+        with self._sources_lock:
+            if self._sources is not None:
+                self._sources.discard(source)
         logger.info("Deleted %d chunks for source '%s'", len(ids_to_delete), source)
         return len(ids_to_delete)
 
-    async def reset(self) -> int:
-        """Delete the entire collection and recreate it. Returns previous document count."""
+    async def reset(self) -> int | None:
+        """Delete the entire collection and recreate it.
+
+        Returns the previous chunk count, or None unless
+        ``config.reset_report_count`` is set, since counting costs a full
+        pass over a large collection just before it is dropped.
+        """
+        return await asyncio.to_thread(self._reset)
+
+    def _reset(self) -> int | None:
         collection = self._get_collection()
-        count = collection.count()
+        count = None
+        if config.reset_report_count:
+            try:
+                count = collection.count()
+            except Exception as exc:
+                logger.warning("Could not count chunks before reset: %s", exc)
         client = self._get_client()
-        client.delete_collection(config.chroma_collection)
-        self._collection = None  # force re-creation on next access
-        logger.info("Reset collection '%s' (%d chunks removed)", config.chroma_collection, count)
+        with self._init_lock:
+            client.delete_collection(config.chroma_collection)
+            self._collection = None  # force re-creation on next access
+        self._result_cache.clear()
+        with self._sources_lock:
+            self._sources = set()
+        logger.info("Reset collection '%s' (%s chunks removed)", config.chroma_collection, count)
         return count
 
     async def status(self) -> dict:
         """Return current status of the vector store."""
         try:
-            collection = self._get_collection()
-            count = collection.count()
+            count = await asyncio.to_thread(lambda: self._get_collection().count())
             return {
                 "status": "connected",
                 "collection": config.chroma_collection,
                 "total_chunks": count,
-                "embedding_model": config.embedding_model,
+                "embedding_model": self.model_name,
             }
         except Exception as exc:
             return {
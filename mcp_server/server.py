@@ -1,10 +1,10 @@
 """Main MCP server exposing RAG tools and stats resources."""
 
 import asyncio
-import json
 import logging
 import sys
 
+import orjson
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Resource, TextContent, Tool
@@ -12,6 +12,7 @@ from mcp.types import Resource, TextContent, Tool
 from .config import config
 from .logging_utils import (
     QueryTimer,
+    close_log_writer,
     create_indexing_job,
     get_job_stats,
     get_query_stats,
@@ -74,6 +75,26 @@ TOOLS = [
             "required": ["query"],
         },
     ),
+    Tool(
+        name="query_documents_batch",
+        description="Run several RAG queries in one call. Returns relevant passages with sources for each query.",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "queries": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "The search queries.",
+                },
+                "top_k": {
+                    "type": "integer",
+                    "description": "Number of results to return per query (default 5).",
+                    "default": 5,
+                },
+            },
+            "required": ["queries"],
+        },
+    ),
     Tool(
         name="search_similar",
         description="Search for documents similar to the query. Returns a list of matching chunks with similarity scores.",
@@ -148,6 +169,11 @@ TOOLS = [
 ]
 
 
+def _dumps(data: dict) -> str:
+    """Serialize a tool or resource payload as indented JSON."""
+    return orjson.dumps(data, option=orjson.OPT_INDENT_2).decode()
+
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     return TOOLS
@@ -158,11 +184,11 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     """Dispatch tool calls to the appropriate handler."""
     try:
         result = await _dispatch_tool(name, arguments)
-        return [TextContent(type="text", text=json.dumps(result, indent=2))]
+        return [TextContent(type="text", text=_dumps(result))]
     except Exception as exc:
         logger.exception("Tool '%s' failed", name)
         error_body = {"error": str(exc), "tool": name}
-        return [TextContent(type="text", text=json.dumps(error_body, indent=2))]
+        return [TextContent(type="text", text=_dumps(error_body))]
 
 
 async def _dispatch_tool(name: str, arguments: dict) -> dict:
@@ -170,6 +196,8 @@ async def _dispatch_tool(name: str, arguments: dict) -> dict:
         return await _tool_index_documents(arguments)
     elif name == "query_documents":
         return await _tool_query_documents(arguments)
+    elif name == "query_documents_batch":
+        return await _tool_query_documents_batch(arguments)
     elif name == "search_similar":
         return await _tool_search_similar(arguments)
     elif name == "get_document_summary":
@@ -222,6 +250,23 @@ async def _tool_index_documents(args: dict) -> dict:
         raise
 
 
+def _summarize_hits(hits: list[dict]) -> tuple[list[dict], str]:
+    """Return the source list and passage text for a query's hits."""
+    sources = []
+    passages = []
+    # One pass builds both the source list and the response text
+    for h in hits:
+        source, chunk_index, similarity = h["source"], h["chunk_index"], h["similarity"]
+        sources.append({"source": source, "chunk_index": chunk_index, "similarity": similarity})
+        passages.append(f"[{source} chunk {chunk_index}] (similarity: {similarity})\n{h['text']}")
+
+    if passages:
+        response_text = f"Found {len(hits)} relevant passages:\n\n" + "\n\n---\n\n".join(passages)
+    else:
+        response_text = "No relevant documents found for this query."
+    return sources, response_text
+
+
 async def _tool_query_documents(args: dict) -> dict:
     query_text = args["query"]
     top_k = args.get("top_k", config.default_top_k)
@@ -229,20 +274,7 @@ async def _tool_query_documents(args: dict) -> dict:
     with QueryTimer() as timer:
         hits = await rag.query(query_text, top_k)
 
-    sources = [
-        {"source": h["source"], "chunk_index": h["chunk_index"], "similarity": h["similarity"]}
-        for h in hits
-    ]
-
-    # Build response text from retrieved chunks
-    if hits:
-        passages = "\n\n---\n\n".join(
-            f"[{h['source']} chunk {h['chunk_index']}] (similarity: {h['similarity']})\n{h['text']}"
-            for h in hits
-        )
-        response_text = f"Found {len(hits)} relevant passages:\n\n{passages}"
-    else:
-        response_text = "No relevant documents found for this query."
+    sources, response_text = _summarize_hits(hits)
 
     await log_query(
         query_text=query_text,
@@ -260,6 +292,34 @@ async def _tool_query_documents(args: dict) -> dict:
     }
 
 
+async def _tool_query_documents_batch(args: dict) -> dict:
+    query_texts = args["queries"]
+    top_k = args.get("top_k", config.default_top_k)
+
+    with QueryTimer() as timer:
+        all_hits = await rag.query_batch(query_texts, top_k)
+
+    results = []
+    for query_text, hits in zip(query_texts, all_hits):
+        sources, response_text = _summarize_hits(hits)
+        await log_query(
+            query_text=query_text,
+            response_text=response_text,
+            sources=sources,
+            response_time_ms=timer.elapsed_ms,
+        )
+        results.append(
+            {
+                "query": query_text,
+                "response": response_text,
+                "sources": sources,
+                "result_count": len(hits),
+            }
+        )
+
+    return {"results": results, "response_time_ms": timer.elapsed_ms}
+
+
 async def _tool_search_similar(args: dict) -> dict:
     query_text = args["query"]
     top_k = args.get("top_k", config.default_top_k)
@@ -350,7 +410,7 @@ async def read_resource(uri: str) -> str:
         data = await get_system_stats()
     else:
         data = {"error": f"Unknown resource: {uri_str}"}
-    return json.dumps(data, indent=2)
+    return _dumps(data)
 
 
 # ---------------------------------------------------------------------------
@@ -364,8 +424,11 @@ async def main():
     await init_db()
     logger.info("Starting MCP server '%s'...", config.server_name)
 
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(read_stream, write_stream, app.create_initialization_options())
+    try:
+        async with stdio_server() as (read_stream, write_stream):
+            await app.run(read_stream, write_stream, app.create_initialization_options())
+    finally:
+        await close_log_writer()
 
 
 def run():
@@ -14,16 +14,29 @@ This script:
 from __future__ import annotations
 
 import argparse
+import fcntl
+import glob
 import hashlib
+import io
 import logging
+import mmap
 import os
+import queue
 import shutil
+import struct
 import sys
 import tempfile
+import threading
 import zipfile
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Callable
 
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 
 from .pipeline import Pipeline
@@ -86,41 +99,279 @@ DATASETS: dict[int, dict] = {
 PRESET_SMALL = [5, 6, 7, 12]          # ~323 MB
 PRESET_ALL_SMALL = [1, 2, 3, 4, 5, 6, 7, 12]  # ~2.1 GB (skip 8-11 which are 10-180 GB)
 
+# Datasets downloaded at once
+_DOWNLOAD_WORKERS = 4
+# Bytes read from the response per iteration
+_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# Files at least this large are fetched as parallel byte ranges when the
+# server supports it, in parts of _RANGE_PART_SIZE on _RANGE_WORKERS threads
+_RANGE_MIN_SIZE = 256 * 1024 * 1024
+_RANGE_PART_SIZE = 32 * 1024 * 1024
+_RANGE_WORKERS = 8
+# Downloaded chunks buffered for the hashing thread
+_HASH_QUEUE_SIZE = 8
+# Threads inflating members of one ZIP
+_EXTRACT_THREADS = 8
+# Read size when copying a PDF out of a ZIP
+_COPY_BUFSIZE = 1024 * 1024
+# Extracted files at least this large have their space reserved up front
+_PREALLOCATE_MIN_SIZE = 1024 * 1024
+# Fixed part of a ZIP local file header
+_LOCAL_HEADER_SIZE = 30
+# Processed documents buffered ahead of the indexing loop
+_DOC_QUEUE_SIZE = 16
+# Upsert batches buffered between PDF processing and indexing
+_INDEX_QUEUE_SIZE = 8
+
+
+def _make_session() -> requests.Session:
+    """A shared session, so downloads from the same mirror reuse connections."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=_DOWNLOAD_WORKERS, pool_maxsize=_DOWNLOAD_WORKERS * _RANGE_WORKERS
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session = _make_session()
+
 
 def download_file(url: str, dest: Path, expected_sha256: str | None = None) -> bool:
-    """Download a file with progress bar. Returns True on success."""
+    """Download a file with progress bar. Returns True on success.
+
+    Data goes to a ``.part`` file next to ``dest``, is flushed to disk and
+    only then renamed to ``dest``, so an interrupted download never leaves a
+    partial ``dest``. If the server supports byte ranges, the ``.part`` file
+    of an interrupted single-stream download is kept and the next attempt
+    from the same URL resumes from its end.
+    """
     logger.info("Downloading %s", url)
+    # Named per URL, since mirrors may serve different copies of a dataset
+    # and a resume must continue the same file
+    url_tag = hashlib.sha256(url.encode()).hexdigest()[:8]
+    part = dest.with_name(f"{dest.name}.{url_tag}.part")
+    resumable = False
     try:
-        resp = requests.get(url, stream=True, timeout=60)
-        resp.raise_for_status()
-    except requests.RequestException as exc:
+        size, accepts_ranges = _probe(url)
+        if accepts_ranges and size >= _RANGE_MIN_SIZE:
+            _download_ranges(url, part, size)
+            digest = None  # parts arrive out of order; hashed afterwards
+        else:
+            resumable = accepts_ranges
+            digest = _download_stream(
+                url, part, size, resume=resumable, hash_content=bool(expected_sha256)
+            )
+    except (requests.RequestException, urllib3.exceptions.HTTPError, OSError) as exc:
         logger.warning("Download failed from %s: %s", url, exc)
+        if not resumable:
+            part.unlink(missing_ok=True)
         return False
+    os.replace(part, dest)
+    # Partial downloads from other mirrors are no longer needed
+    for stale in dest.parent.glob(f"{glob.escape(dest.name)}.*.part"):
+        stale.unlink(missing_ok=True)
 
-    total = int(resp.headers.get("content-length", 0))
-    sha = hashlib.sha256()
+    if expected_sha256:
+        # Don't fail on a mismatch — hash variants exist between DOJ/archive copies
+        if digest is None:
+            verify_sha256(dest, expected_sha256)
+        else:
+            _sha256_matches(dest, digest, expected_sha256)
 
-    with open(dest, "wb") as f, tqdm(
-        total=total, unit="B", unit_scale=True, desc=dest.name
-    ) as pbar:
-        for chunk in resp.iter_content(chunk_size=65536):
-            f.write(chunk)
-            sha.update(chunk)
-            pbar.update(len(chunk))
+    return True
 
-    if expected_sha256:
-        actual = sha.hexdigest().lower()
-        expected = expected_sha256.lower()
-        if actual != expected:
-            logger.warning(
-                "SHA256 mismatch for %s: expected %s, got %s",
-                dest.name, expected[:16] + "...", actual[:16] + "...",
-            )
-            # Don't fail — hash variants exist between DOJ/archive copies
 
+def _download_stream(
+    url: str, dest: Path, size: int, resume: bool, hash_content: bool
+) -> str | None:
+    """Download ``url`` over one connection. Returns its SHA-256 if requested.
+
+    With ``resume``, an existing ``dest`` shorter than ``size`` is treated as
+    the start of the file and only the rest is requested.
+    """
+    offset = 0
+    if resume and dest.exists():
+        offset = dest.stat().st_size
+        if not 0 < offset < size:
+            offset = 0
+
+    headers = {}
+    if resume:
+        # Byte offsets must refer to the file itself, not an encoded body
+        headers["Accept-Encoding"] = "identity"
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+    resp = _session.get(url, headers=headers, stream=True, timeout=60)
+    resp.raise_for_status()
+    if offset and resp.status_code != 206:
+        offset = 0  # Range ignored; the full file is coming
+    if offset:
+        logger.info("Resuming %s at %d bytes", dest.name, offset)
+
+    total = offset + int(resp.headers.get("content-length", 0))
+    sha = hashlib.sha256()
+    if hash_content and offset:
+        with open(dest, "rb") as f:
+            sha = hashlib.file_digest(f, "sha256")
+            if f.tell() != offset:
+                raise OSError(f"{dest.name} changed while resuming")
+
+    # Hash on a separate thread (hashlib releases the GIL) so it overlaps
+    # with reading the socket and writing the file
+    pending: queue.Queue[bytes | None] = queue.Queue(maxsize=_HASH_QUEUE_SIZE)
+    hasher = threading.Thread(target=_hash_chunks, args=(pending, sha), daemon=True)
+    if hash_content:
+        hasher.start()
+    try:
+        with (
+            open(dest, "ab" if offset else "wb") as f,
+            tqdm(total=total, initial=offset, unit="B", unit_scale=True, desc=dest.name) as pbar,
+        ):
+            # Read the urllib3 stream directly in large blocks, skipping
+            # iter_content's per-chunk generator overhead
+            resp.raw.decode_content = True
+            while chunk := resp.raw.read(_DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                if hash_content:
+                    pending.put(chunk)
+                pbar.update(len(chunk))
+            f.flush()
+            os.fsync(f.fileno())
+    finally:
+        if hash_content:
+            pending.put(None)
+            hasher.join()
+
+    return sha.hexdigest() if hash_content else None
+
+
+def _probe(url: str) -> tuple[int, bool]:
+    """Size of ``url`` (0 if unknown) and whether the server accepts byte ranges."""
+    try:
+        resp = _session.head(url, allow_redirects=True, timeout=30)
+        resp.raise_for_status()
+    except requests.RequestException:
+        return 0, False
+    size = int(resp.headers.get("content-length", 0))
+    return size, size > 0 and resp.headers.get("accept-ranges", "").lower() == "bytes"
+
+
+def _download_ranges(url: str, dest: Path, size: int) -> None:
+    """Fetch ``url`` as concurrent byte ranges written in place into ``dest``."""
+    ranges = [
+        (start, min(start + _RANGE_PART_SIZE, size) - 1)
+        for start in range(0, size, _RANGE_PART_SIZE)
+    ]
+    pbar_lock = threading.Lock()
+    with open(dest, "wb") as f, tqdm(total=size, unit="B", unit_scale=True, desc=dest.name) as pbar:
+        f.truncate(size)
+        fd = f.fileno()
+
+        def progress(n: int) -> None:
+            with pbar_lock:
+                pbar.update(n)
+
+        stop = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=_RANGE_WORKERS)
+        try:
+            futures = [
+                pool.submit(_fetch_range, url, fd, start, end, progress, stop)
+                for start, end in ranges
+            ]
+            for future in as_completed(futures):
+                future.result()
+        finally:
+            # After a failure, queued ranges are dropped and running ones
+            # stop at their next read, so the next mirror is tried at once
+            stop.set()
+            pool.shutdown(cancel_futures=True)
+        os.fsync(fd)
+
+
+def _fetch_range(
+    url: str,
+    fd: int,
+    start: int,
+    end: int,
+    progress: Callable[[int], None],
+    stop: threading.Event,
+) -> None:
+    """Download bytes ``start``..``end`` (inclusive) of ``url`` into ``fd`` at ``start``.
+
+    Returns early, leaving the range incomplete, once ``stop`` is set.
+    """
+    with _session.get(
+        url,
+        headers={"Range": f"bytes={start}-{end}", "Accept-Encoding": "identity"},
+        stream=True,
+        timeout=60,
+    ) as resp:
+        resp.raise_for_status()
+        if resp.status_code != 206:
+            raise requests.RequestException(f"Range request for bytes {start}-{end} not honoured")
+        offset = start
+        while chunk := resp.raw.read(_DOWNLOAD_CHUNK_SIZE):
+            if stop.is_set():
+                return
+            view = memoryview(chunk)
+            while view:
+                written = os.pwrite(fd, view, offset)
+                view = view[written:]
+                offset += written
+            progress(len(chunk))
+    if offset != end + 1:
+        raise requests.RequestException(f"Short read for bytes {start}-{end}")
+
+
+def verify_sha256(path: Path, expected_sha256: str) -> bool:
+    """Hash a file already on disk and compare it with ``expected_sha256``.
+
+    hashlib.file_digest reads into a reusable buffer and hashes with the
+    GIL released, using the CPU's SHA extensions where available.
+    """
+    with open(path, "rb") as f:
+        actual = hashlib.file_digest(f, "sha256").hexdigest()
+    return _sha256_matches(path, actual, expected_sha256)
+
+
+def _sha256_matches(path: Path, actual: str, expected: str) -> bool:
+    """Compare hex digests, logging a warning on mismatch."""
+    actual = actual.lower()
+    expected = expected.lower()
+    if actual != expected:
+        logger.warning(
+            "SHA256 mismatch for %s: expected %s, got %s",
+            path.name,
+            expected[:16] + "...",
+            actual[:16] + "...",
+        )
+        return False
     return True
 
 
+def _hash_chunks(pending: queue.Queue, sha) -> None:
+    """Feed queued chunks into ``sha`` until a None sentinel arrives."""
+    while (chunk := pending.get()) is not None:
+        sha.update(chunk)
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive flock on ``path`` (created if missing)."""
+    with open(path, "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            logger.info("Waiting for another process downloading %s", path.stem)
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
 def download_dataset(ds_num: int, download_dir: Path) -> Path | None:
     """Download a single dataset ZIP, trying mirrors in order. Returns path or None."""
     info = DATASETS.get(ds_num)
@@ -131,35 +382,261 @@ def download_dataset(ds_num: int, download_dir: Path) -> Path | None:
     zip_name = f"DataSet_{ds_num}.zip"
     zip_path = download_dir / zip_name
 
-    if zip_path.exists():
-        logger.info("Dataset %d already downloaded: %s", ds_num, zip_path)
-        return zip_path
-
-    for url in info["urls"]:
-        if download_file(url, zip_path, info.get("sha256")):
+    # Serializes concurrent runs fetching the same dataset; a run that
+    # waits here then finds the finished ZIP
+    with _file_lock(zip_path.with_suffix(".lock")):
+        if zip_path.exists():
+            logger.info("Dataset %d already downloaded: %s", ds_num, zip_path)
+            if info.get("sha256"):
+                # Flags a corrupted earlier download
+                verify_sha256(zip_path, info["sha256"])
             return zip_path
 
+        for url in info["urls"]:
+            if download_file(url, zip_path, info.get("sha256")):
+                return zip_path
+
     logger.error("All download sources failed for Dataset %d", ds_num)
     return None
 
 
+def _pdf_members(zf: zipfile.ZipFile) -> list[zipfile.ZipInfo]:
+    """Non-empty PDF members of a ZIP."""
+    return [
+        info
+        for info in zf.infolist()
+        if not info.is_dir() and info.filename.lower().endswith(".pdf") and info.file_size
+    ]
+
+
 def extract_pdfs(zip_path: Path, output_dir: Path) -> int:
-    """Extract PDF files from a ZIP archive. Returns count of extracted PDFs."""
-    count = 0
-    with zipfile.ZipFile(zip_path, "r") as zf:
-        for info in zf.infolist():
-            if info.is_dir():
+    """Extract PDF files from a ZIP archive. Returns count of extracted PDFs.
+
+    Members are inflated in parallel threads (zlib releases the GIL). The
+    archive is memory-mapped once and each thread reads it through its own
+    ZipFile over that mapping, so reads are copies out of the page cache
+    rather than system calls on separate file handles. The ZipFile that
+    lists the members is handed to the first thread.
+    """
+    src_fd = os.open(zip_path, os.O_RDONLY)
+    try:
+        mapping = mmap.mmap(src_fd, 0, access=mmap.ACCESS_READ)
+    except BaseException:
+        os.close(src_fd)
+        raise
+    view = memoryview(mapping)
+    local = threading.local()
+    handles: list[zipfile.ZipFile] = []
+    handles_lock = threading.Lock()
+
+    def extract_one(info: zipfile.ZipInfo) -> bool:
+        zf = getattr(local, "zf", None)
+        if zf is None:
+            with handles_lock:
+                zf = spare.pop() if spare else None
+            if zf is None:
+                zf = zipfile.ZipFile(_MappedFile(view), "r")
+                with handles_lock:
+                    handles.append(zf)
+            local.zf = zf
+        return _extract_member(zf, src_fd, info, output_dir)
+
+    try:
+        handles.append(zipfile.ZipFile(_MappedFile(view), "r"))
+        spare = list(handles)
+        members = _pdf_members(handles[0])
+        if not members:
+            return 0
+        with ThreadPoolExecutor(
+            max_workers=min(_EXTRACT_THREADS, os.cpu_count() or 1, len(members))
+        ) as pool:
+            return sum(pool.map(extract_one, members))
+    finally:
+        for zf in handles:
+            zf.fp.close()
+            zf.close()
+        view.release()
+        mapping.close()
+        os.close(src_fd)
+
+
+class _MappedFile(io.RawIOBase):
+    """Read-only file over a shared memory mapping, with its own position.
+
+    mmap objects have a single position and no ``seekable()`` before
+    Python 3.13, so each thread's ZipFile reads through one of these.
+    """
+
+    def __init__(self, view: memoryview) -> None:
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        if offset < 0:
+            raise ValueError(f"negative seek position {offset}")
+        self._pos = offset
+        return offset
+
+    def read(self, size: int = -1) -> bytes:
+        start = min(self._pos, len(self._view))
+        end = len(self._view) if size is None or size < 0 else min(start + size, len(self._view))
+        self._pos = end
+        return self._view[start:end].tobytes()
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _extract_member(
+    zf: zipfile.ZipFile, src_fd: int, info: zipfile.ZipInfo, output_dir: Path
+) -> bool:
+    """Write one member to ``output_dir``, flattened. False if the file exists.
+
+    ``src_fd`` is a descriptor for the archive itself, for kernel copies.
+    """
+    # Flatten directory structure — extract to output_dir directly
+    target = output_dir / Path(info.filename).name
+    # O_EXCL so concurrent extractions never write the same file twice
+    try:
+        fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "wb") as dst:
+        _preallocate(fd, info.file_size)
+        if not _copy_stored(src_fd, info, fd):
+            _preallocate(fd, info.file_size)  # _copy_stored truncated it
+            with zf.open(info) as src:
+                # Large reads mean fewer decompress calls through ZipExtFile's buffering
+                shutil.copyfileobj(src, dst, min(info.file_size, _COPY_BUFSIZE))
+    return True
+
+
+def _preallocate(fd: int, size: int) -> None:
+    """Reserve ``size`` bytes for ``fd`` up front so the file gets few, large extents.
+
+    Skipped for small files and where posix_fallocate is unavailable or
+    unsupported by the filesystem.
+    """
+    if size < _PREALLOCATE_MIN_SIZE or not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except OSError:
+        pass
+
+
+def _copy_stored(src_fd: int, info: zipfile.ZipInfo, dst_fd: int) -> bool:
+    """Copy an uncompressed member straight from the archive inside the kernel.
+
+    Uses copy_file_range, or sendfile where that is unavailable, so the
+    bytes never pass through Python. The CRC is not checked on this path.
+    Returns False, with ``dst_fd`` left empty, if the member is compressed
+    or encrypted or the kernel copy fails; the caller then copies it the
+    normal way.
+    """
+    if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:
+        return False
+    # Member data follows its local header, whose name/extra lengths can
+    # differ from the central directory's
+    header = os.pread(src_fd, _LOCAL_HEADER_SIZE, info.header_offset)
+    if len(header) != _LOCAL_HEADER_SIZE or header[:4] != b"PK\x03\x04":
+        return False
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    offset = info.header_offset + _LOCAL_HEADER_SIZE + name_len + extra_len
+
+    copied = 0
+    use_copy_range = hasattr(os, "copy_file_range")
+    while copied < info.file_size:
+        remaining = info.file_size - copied
+        try:
+            if use_copy_range:
+                n = os.copy_file_range(src_fd, dst_fd, remaining, offset + copied, copied)
+            else:
+                n = os.sendfile(dst_fd, src_fd, offset + copied, remaining)
+        except OSError:
+            if not use_copy_range:
+                break
+            # e.g. EXDEV across filesystems on older kernels; sendfile
+            # writes at the file position, so move it to where we are
+            use_copy_range = False
+            os.lseek(dst_fd, copied, os.SEEK_SET)
+            continue
+        if n == 0:
+            break
+        copied += n
+    if copied == info.file_size:
+        return True
+    os.ftruncate(dst_fd, 0)
+    os.lseek(dst_fd, 0, os.SEEK_SET)
+    return False
+
+
+def list_pdfs(directory: Path) -> list[Path]:
+    """PDFs directly inside ``directory``, sorted by name.
+
+    Uses os.scandir so only the PDFs become Path objects and file types come
+    from the directory listing. The extension check is case-insensitive,
+    matching what extract_pdfs writes.
+    """
+    with os.scandir(directory) as entries:
+        names = sorted(
+            entry.name
+            for entry in entries
+            if not entry.name.startswith(".")
+            and entry.name.lower().endswith(".pdf")
+            and entry.is_file()
+        )
+    return [directory / name for name in names]
+
+
+def download_and_extract(
+    selected: list[int], download_dir: Path, pdf_dir: Path
+) -> tuple[list[Path], int]:
+    """Download datasets concurrently, extracting each ZIP as soon as it arrives.
+
+    Downloads run in threads (network bound) and extraction in processes
+    (DEFLATE is CPU bound), so unzipping finished datasets overlaps with
+    the remaining downloads. Returns the downloaded ZIPs and the number of
+    PDFs extracted.
+    """
+    zip_files: list[Path] = []
+    total_pdfs = 0
+    extract_workers = min(len(selected), os.cpu_count() or 1) or 1
+    with (
+        ThreadPoolExecutor(max_workers=_DOWNLOAD_WORKERS) as dl_pool,
+        ProcessPoolExecutor(max_workers=extract_workers) as ex_pool,
+    ):
+        downloads = {dl_pool.submit(download_dataset, n, download_dir): n for n in selected}
+        extracts = {}
+        for future in as_completed(downloads):
+            zip_path = future.result()
+            if zip_path is None:
+                logger.warning("Skipping dataset %d (download failed)", downloads[future])
                 continue
-            if info.filename.lower().endswith(".pdf"):
-                # Flatten directory structure — extract to output_dir directly
-                filename = Path(info.filename).name
-                target = output_dir / filename
-                if target.exists():
-                    continue
-                with zf.open(info) as src, open(target, "wb") as dst:
-                    shutil.copyfileobj(src, dst)
-                count += 1
-    return count
+            zip_files.append(zip_path)
+            logger.info("Extracting PDFs from %s...", zip_path.name)
+            extracts[ex_pool.submit(extract_pdfs, zip_path, pdf_dir)] = zip_path
+
+        for future in as_completed(extracts):
+            count = future.result()
+            total_pdfs += count
+            logger.info("  Extracted %d PDFs from %s", count, extracts[future].name)
+    return sorted(zip_files), total_pdfs
 
 
 def main():
@@ -223,30 +700,15 @@ def main():
     ensure_directory(download_dir)
     ensure_directory(pdf_dir)
 
-    # Phase 1: Download
-    logger.info("=== Phase 1: Download ZIPs ===")
-    zip_files: list[Path] = []
-    for ds_num in selected:
-        zip_path = download_dataset(ds_num, download_dir)
-        if zip_path:
-            zip_files.append(zip_path)
-        else:
-            logger.warning("Skipping dataset %d (download failed)", ds_num)
+    # Phases 1 and 2: Download ZIPs and extract PDFs, overlapped
+    logger.info("=== Phase 1+2: Download ZIPs and extract PDFs ===")
+    zip_files, total_pdfs = download_and_extract(selected, download_dir, pdf_dir)
 
     if not zip_files:
         logger.error("No datasets downloaded successfully")
         sys.exit(1)
 
-    # Phase 2: Extract PDFs
-    logger.info("=== Phase 2: Extract PDFs ===")
-    total_pdfs = 0
-    for zp in zip_files:
-        logger.info("Extracting PDFs from %s...", zp.name)
-        count = extract_pdfs(zp, pdf_dir)
-        total_pdfs += count
-        logger.info("  Extracted %d PDFs", count)
-
-    existing_pdfs = list(pdf_dir.glob("*.pdf"))
+    existing_pdfs = list_pdfs(pdf_dir)
     logger.info("Total PDFs in %s: %d", pdf_dir, len(existing_pdfs))
 
     if not existing_pdfs:
@@ -271,76 +733,143 @@ def main():
     # Run processing + indexing directly
     import asyncio
     import time
-    import uuid
     from datetime import datetime, timezone
 
     from .document_processor import DocumentProcessor
 
+    async def iter_in_thread(items):
+        """Yield from a blocking iterator that runs on its own thread.
+
+        The thread stays up to _DOC_QUEUE_SIZE items ahead of the consumer,
+        so processing continues while the event loop awaits other work.
+        An exception from the iterator is re-raised here.
+        """
+        loop = asyncio.get_running_loop()
+        queue_: asyncio.Queue = asyncio.Queue(maxsize=_DOC_QUEUE_SIZE)
+        done = object()
+        failure: list[BaseException] = []
+
+        def run():
+            try:
+                for item in items:
+                    asyncio.run_coroutine_threadsafe(queue_.put(item), loop).result()
+            except BaseException as exc:
+                failure.append(exc)
+            asyncio.run_coroutine_threadsafe(queue_.put(done), loop).result()
+
+        threading.Thread(target=run, name="process-docs", daemon=True).start()
+        while (item := await queue_.get()) is not done:
+            yield item
+        if failure:
+            raise failure[0]
+
     async def run_indexing():
         start_time = time.time()
-        pipeline._job_id = str(uuid.uuid4())
+        pipeline._new_job()
         await pipeline._update_job(
             status="processing",
             started_at=datetime.now(timezone.utc),
         )
 
-        processor = DocumentProcessor(
-            chunk_size=pipeline.chunk_size,
-            chunk_overlap=pipeline.chunk_overlap,
-            max_workers=pipeline.max_workers,
-            batch_size=pipeline.batch_size,
-        )
-
-        files = sorted(pdf_dir.glob("*.pdf"))
-        total_files = len(files)
-        await pipeline._update_job(total_files=total_files)
-        logger.info("Processing %d PDF files...", total_files)
-
-        all_chunks = []
-        processed_count = 0
-        failed_count = 0
+        try:
+            processor = DocumentProcessor(
+                chunk_size=pipeline.chunk_size,
+                chunk_overlap=pipeline.chunk_overlap,
+                max_workers=pipeline.max_workers,
+                batch_size=pipeline.batch_size,
+            )
 
-        for doc in processor.process_batch_parallel(files):
-            if doc.error:
-                failed_count += 1
-                logger.warning("Failed: %s -- %s", doc.filename, doc.error)
-            else:
-                processed_count += 1
-                all_chunks.extend(doc.chunks)
+            # Listed once above; extraction has finished, so it is still current
+            files = existing_pdfs
+            total_files = len(files)
+            await pipeline._update_job(total_files=total_files)
+            logger.info("Processing %d PDF files...", total_files)
+
+            # Processing and indexing overlap: the producer pushes full upsert
+            # batches into a bounded queue that index_workers consumers drain,
+            # so memory stays at a few batches rather than every chunk
+            batches: asyncio.Queue[list | None] = asyncio.Queue(maxsize=_INDEX_QUEUE_SIZE)
+            total_chunks = 0
+            processed_count = 0
+            failed_count = 0
+
+            async def produce():
+                nonlocal total_chunks, processed_count, failed_count
+                batch = []
+                try:
+                    async for doc in iter_in_thread(processor.process_batch_parallel(files)):
+                        if doc.error:
+                            failed_count += 1
+                            logger.warning("Failed: %s -- %s", doc.filename, doc.error)
+                        else:
+                            processed_count += 1
+                            batch.extend(doc.chunks)
+                            total_chunks += len(doc.chunks)
+                            if len(batch) >= pipeline.index_batch_size:
+                                await batches.put(batch)
+                                batch = []
+
+                        progress = int(((processed_count + failed_count) / total_files) * 100)
+                        await pipeline._update_job(
+                            processed_files=processed_count,
+                            failed_files=failed_count,
+                            progress_percent=min(progress, 99),
+                            current_file=doc.filename,
+                        )
+
+                    await pipeline._update_job(current_file="Indexing into vector store...")
+                    if batch:
+                        await batches.put(batch)
+                finally:
+                    for _ in range(pipeline.index_workers):
+                        await batches.put(None)
+
+            async def consume() -> int:
+                count = 0
+                while (batch := await batches.get()) is not None:
+                    count += await pipeline._index_chunks(batch)
+                return count
+
+            _, *counts = await asyncio.gather(
+                produce(), *(consume() for _ in range(pipeline.index_workers))
+            )
+            indexed = sum(counts)
+            logger.info("=== Indexed %d/%d chunks into ChromaDB ===", indexed, total_chunks)
 
-            progress = int(((processed_count + failed_count) / total_files) * 100)
+            elapsed = time.time() - start_time
             await pipeline._update_job(
-                processed_files=processed_count,
-                failed_files=failed_count,
-                progress_percent=min(progress, 99),
-                current_file=doc.filename,
+                status="completed",
+                progress_percent=100,
+                current_file="",
+                completed_at=datetime.now(timezone.utc),
             )
 
-        logger.info("=== Indexing %d chunks into ChromaDB ===", len(all_chunks))
-        await pipeline._update_job(current_file="Indexing into vector store...")
-        indexed = await pipeline._index_chunks(all_chunks)
-
-        elapsed = time.time() - start_time
-        await pipeline._update_job(
-            status="completed",
-            progress_percent=100,
-            current_file="",
-            completed_at=datetime.now(timezone.utc),
-        )
+            return {
+                "status": "completed",
+                "total_files": total_files,
+                "processed_files": processed_count,
+                "failed_files": failed_count,
+                "total_chunks": total_chunks,
+                "indexed_chunks": indexed,
+                "elapsed_seconds": round(elapsed, 1),
+            }
+
+        except Exception as exc:
+            logger.exception("Indexing failed")
+            await pipeline._update_job(
+                status="failed",
+                error_message=str(exc),
+                completed_at=datetime.now(timezone.utc),
+            )
+            return {"status": "failed", "error": str(exc), "indexed_chunks": 0}
 
-        return {
-            "total_files": total_files,
-            "processed_files": processed_count,
-            "failed_files": failed_count,
-            "total_chunks": len(all_chunks),
-            "indexed_chunks": indexed,
-            "elapsed_seconds": round(elapsed, 1),
-        }
+        finally:
+            await pipeline.close()
 
     summary = asyncio.run(run_indexing())
 
     print("\n" + "=" * 60)
-    print("Data Preparation Complete")
+    print("Data Preparation " + ("Complete" if summary["status"] == "completed" else "Failed"))
     print("=" * 60)
     for key, value in summary.items():
         print(f"  {key}: {value}")
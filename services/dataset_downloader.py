@@ -9,16 +9,16 @@ import subprocess
 import tempfile
 import time
 from pathlib import Path
-from typing import Any, Callable
+from typing import Any, Callable, Iterator
 
 import requests
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from .utils import (
+    SUPPORTED_EXTENSIONS,
     ensure_directory,
     format_file_size,
     get_env,
-    is_supported_file,
 )
 
 logger = logging.getLogger(__name__)
@@ -30,6 +30,23 @@ DEFAULT_REPO_URL = "https://github.com/yung-megafone/Epstein-Files"
 ProgressCallback = Callable[[int, int, str], None]
 
 
+def _walk_files(root: Path, extensions: frozenset[str]) -> Iterator[Path]:
+    """Yield files under ``root`` whose lowercased suffix is in ``extensions``.
+
+    Walks with os.scandir so only matching files become Path objects and
+    file types come from the directory listing instead of extra stat calls.
+    Like rglob, symlinked directories are not followed.
+    """
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in extensions and entry.is_file():
+                    yield Path(entry.path)
+
+
 class GitHubDatasetDownloader:
     """Download datasets from GitHub repositories.
 
@@ -53,6 +70,14 @@ class GitHubDatasetDownloader:
             output_dir or get_env("DATASET_DIR", "./data/raw")
         )
         self.file_extensions = file_extensions  # None means all supported
+        # Lowercased, dot-prefixed suffixes that _matches_filter accepts
+        self._ext_set = (
+            frozenset(
+                ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in file_extensions
+            )
+            if file_extensions
+            else frozenset(SUPPORTED_EXTENSIONS)
+        )
         self.subfolder = subfolder
         self._progress_callback: ProgressCallback | None = None
         self._cancelled = False
@@ -106,14 +131,7 @@ class GitHubDatasetDownloader:
         if not base.exists():
             base = root
 
-        files: list[Path] = []
-        for p in sorted(base.rglob("*")):
-            if not p.is_file():
-                continue
-            if not self._matches_filter(p):
-                continue
-            files.append(p)
-        return files
+        return sorted(_walk_files(base, self._ext_set))
 
     def get_status(self) -> dict[str, Any]:
         """Return a summary dict of what has been downloaded."""
@@ -139,29 +157,48 @@ class GitHubDatasetDownloader:
 
     def _matches_filter(self, path: Path) -> bool:
         """Check if a file matches the configured extension/folder filter."""
-        if self.file_extensions:
-            if path.suffix.lower() not in {
-                ext if ext.startswith(".") else f".{ext}"
-                for ext in self.file_extensions
-            }:
-                return False
-        else:
-            if not is_supported_file(path):
-                return False
-        return True
+        return path.suffix.lower() in self._ext_set
 
     def _clone_with_git(self, dest: Path) -> None:
-        """Shallow-clone the repository using the ``git`` CLI."""
+        """Shallow-clone the repository.
+
+        Clones in-process with pygit2 when it is installed, otherwise with
+        the ``git`` CLI.
+        """
         logger.info("Cloning %s -> %s", self.repo_url, dest)
-        cmd = ["git", "clone", "--depth", "1", self.repo_url, str(dest)]
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=600,
-        )
-        if result.returncode != 0:
-            raise RuntimeError(f"git clone failed: {result.stderr.strip()}")
+        try:
+            import pygit2
+        except ImportError:
+            pygit2 = None
+
+        if pygit2 is not None:
+            downloader = self
+
+            class _Callbacks(pygit2.RemoteCallbacks):
+                def transfer_progress(self, stats) -> None:
+                    # Raising here makes libgit2 abort the fetch
+                    if downloader._cancelled:
+                        raise RuntimeError("Clone cancelled")
+
+            try:
+                pygit2.clone_repository(self.repo_url, str(dest), depth=1, callbacks=_Callbacks())
+            except Exception as exc:
+                # Unlike the CLI, libgit2 leaves a partial clone behind
+                shutil.rmtree(dest, ignore_errors=True)
+                raise RuntimeError(f"git clone failed: {exc}") from exc
+        else:
+            # Only stderr is kept, for the error message; without a terminal
+            # git prints no progress there
+            cmd = ["git", "clone", "--depth", "1", self.repo_url, str(dest)]
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=600,
+            )
+            if result.returncode != 0:
+                raise RuntimeError(f"git clone failed: {result.stderr.strip()}")
         logger.info("Clone complete")
 
     @retry(
@@ -175,7 +212,9 @@ class GitHubDatasetDownloader:
         zip_url = f"{self.repo_url}/archive/refs/heads/main.zip"
         logger.info("Downloading zip archive from %s", zip_url)
 
-        with tempfile.TemporaryDirectory() as tmpdir:
+        # Work inside output_dir so the extracted tree is on dest's filesystem
+        # and can be renamed into place instead of copied
+        with tempfile.TemporaryDirectory(dir=self.output_dir, prefix=".download-") as tmpdir:
             zip_path = Path(tmpdir) / "repo.zip"
 
             # Stream download with progress
@@ -215,19 +254,26 @@ class GitHubDatasetDownloader:
             src = extracted_dirs[0]
             if dest.exists():
                 shutil.rmtree(dest)
-            shutil.copytree(src, dest)
+            os.replace(src, dest)
 
         logger.info("Zip extraction complete -> %s", dest)
 
     def _collect_files(self, dest: Path) -> Path:
-        """Walk the destination directory and report progress."""
+        """Walk the destination directory and report progress.
+
+        Without a progress callback there is nothing to report, so the walk
+        is skipped; callers list the files themselves via ``list_files``.
+        """
+        if self._progress_callback is None:
+            logger.info("Dataset ready at %s", dest)
+            return dest
+
         files = self.list_files(dest)
         total = len(files)
         for idx, f in enumerate(files, 1):
             if self._cancelled:
                 logger.info("Collection cancelled after %d/%d files", idx - 1, total)
                 break
-            if self._progress_callback:
-                self._progress_callback(idx, total, f.name)
+            self._progress_callback(idx, total, f.name)
         logger.info("Collected %d supported files from %s", total, dest)
         return dest
@@ -7,15 +7,18 @@ handling and resume capability.
 
 from __future__ import annotations
 
-import hashlib
+import bisect
 import json
 import logging
 import os
 import time
 from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Callable, Generator
+from typing import Any, Callable, Generator, Iterable, Iterator
+
+import xxhash
 
 from .utils import (
     classify_document_type,
@@ -31,6 +34,11 @@ logger = logging.getLogger(__name__)
 # Progress callback: (processed, total, current_file, status)
 ProcessorProgressCallback = Callable[[int, int, str, str], None]
 
+# Leading characters of a document used to classify its type
+_CLASSIFY_SAMPLE_CHARS = 2000
+# Processed files between writes of the resume state file
+_STATE_SAVE_EVERY = 25
+
 
 @dataclass
 class DocumentChunk:
@@ -61,13 +69,37 @@ class ProcessingState:
 
     completed_files: set[str] = field(default_factory=set)
     failed_files: dict[str, str] = field(default_factory=dict)
+    # Results recorded since the last save
+    _unsaved: int = field(default=0, init=False, repr=False, compare=False)
 
     def save(self, path: Path) -> None:
         data = {
             "completed": list(self.completed_files),
             "failed": self.failed_files,
         }
-        path.write_text(json.dumps(data, indent=2))
+        # Write a sibling file and rename it over the old one, so a crash
+        # mid-write never leaves a truncated state file
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(data, indent=2))
+        os.replace(tmp, path)
+        self._unsaved = 0
+
+    def checkpoint(self, path: Path | None) -> None:
+        """Count one recorded result and save every ``_STATE_SAVE_EVERY`` results.
+
+        Rewriting the whole file after every result costs O(n^2) bytes over a
+        run; after a crash at most that many files are processed again.
+        """
+        if path is None:
+            return
+        self._unsaved += 1
+        if self._unsaved >= _STATE_SAVE_EVERY:
+            self.save(path)
+
+    def flush(self, path: Path | None) -> None:
+        """Save any results recorded since the last save."""
+        if path is not None and self._unsaved:
+            self.save(path)
 
     @classmethod
     def load(cls, path: Path) -> ProcessingState:
@@ -125,10 +157,10 @@ class DocumentProcessor:
 
         try:
             if is_pdf(file_path):
-                text, page_count = self._extract_pdf(file_path)
-            else:
-                text = file_path.read_text(encoding="utf-8", errors="replace")
-                page_count = 1
+                return self._process_pdf(file_path)
+
+            text = file_path.read_text(encoding="utf-8", errors="replace")
+            page_count = 1
 
             doc_type = classify_document_type(filename, text)
             chunks = self._chunk_text(text, file_path, page_count, doc_type)
@@ -180,26 +212,28 @@ class DocumentProcessor:
 
         start_time = time.time()
 
-        for idx, file_path in enumerate(pending, 1):
-            if self._cancelled:
-                logger.info("Processing cancelled at %d/%d", done + idx - 1, total)
-                break
+        try:
+            for idx, file_path in enumerate(pending, 1):
+                if self._cancelled:
+                    logger.info("Processing cancelled at %d/%d", done + idx - 1, total)
+                    break
 
-            current_name = file_path.name
-            if self._progress_callback:
-                self._progress_callback(done + idx, total, current_name, "processing")
+                current_name = file_path.name
+                if self._progress_callback:
+                    self._progress_callback(done + idx, total, current_name, "processing")
 
-            result = self.process_file(file_path)
+                result = self.process_file(file_path)
 
-            if result.error:
-                state.failed_files[str(file_path)] = result.error
-            else:
-                state.completed_files.add(str(file_path))
+                if result.error:
+                    state.failed_files[str(file_path)] = result.error
+                else:
+                    state.completed_files.add(str(file_path))
 
-            if state_path:
-                state.save(state_path)
+                state.checkpoint(state_path)
 
-            yield result
+                yield result
+        finally:
+            state.flush(state_path)
 
         if self._progress_callback and not self._cancelled:
             self._progress_callback(total, total, "", "completed")
@@ -227,19 +261,26 @@ class DocumentProcessor:
 
         start_time = time.time()
 
-        # Process in batches to keep memory bounded
-        for batch_start in range(0, len(pending), self.batch_size):
-            if self._cancelled:
-                break
-
-            batch = pending[batch_start : batch_start + self.batch_size]
-
-            try:
-                with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
-                    future_to_path = {
-                        pool.submit(_process_file_worker, fp, self.chunk_size, self.chunk_overlap): fp
-                        for fp in batch
-                    }
+        # One pool for the whole call, so workers (and their PyMuPDF import)
+        # are started once; files are still submitted in batches to keep
+        # memory bounded
+        pool: ProcessPoolExecutor | None = None
+        try:
+            for batch_start in range(0, len(pending), self.batch_size):
+                if self._cancelled:
+                    break
+
+                batch = pending[batch_start : batch_start + self.batch_size]
+
+                try:
+                    if pool is None:
+                        pool = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            initializer=_init_worker,
+                            initargs=(self.chunk_size, self.chunk_overlap),
+                        )
+                    pool_broken = False
+                    future_to_path = {pool.submit(_process_file_worker, fp): fp for fp in batch}
 
                     for future in as_completed(future_to_path):
                         if self._cancelled:
@@ -252,6 +293,8 @@ class DocumentProcessor:
                         try:
                             result = future.result(timeout=120)
                         except Exception as exc:
+                            if isinstance(exc, BrokenProcessPool):
+                                pool_broken = True
                             result = ProcessedDocument(
                                 source_path=str(file_path),
                                 filename=file_path.name,
@@ -267,8 +310,7 @@ class DocumentProcessor:
                         else:
                             state.completed_files.add(str(file_path))
 
-                        if state_path:
-                            state.save(state_path)
+                        state.checkpoint(state_path)
 
                         if self._progress_callback:
                             self._progress_callback(
@@ -277,26 +319,36 @@ class DocumentProcessor:
 
                         yield result
 
-            except Exception as exc:
-                logger.warning(
-                    "Parallel batch failed (%s), falling back to sequential", exc
-                )
-                for fp in batch:
-                    if self._cancelled:
-                        break
-                    if str(fp) in state.completed_files:
-                        continue
-                    done += 1
-                    result = self.process_file(fp)
-                    if result.error:
-                        state.failed_files[str(fp)] = result.error
-                    else:
-                        state.completed_files.add(str(fp))
-                    if state_path:
-                        state.save(state_path)
-                    if self._progress_callback:
-                        self._progress_callback(done, total, fp.name, "processing")
-                    yield result
+                    if pool_broken:
+                        # A worker died; the next batch gets a fresh pool
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        pool = None
+
+                except Exception as exc:
+                    logger.warning("Parallel batch failed (%s), falling back to sequential", exc)
+                    # A broken pool takes no more work; the next batch starts a new one
+                    if pool is not None:
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        pool = None
+                    for fp in batch:
+                        if self._cancelled:
+                            break
+                        if str(fp) in state.completed_files:
+                            continue
+                        done += 1
+                        result = self.process_file(fp)
+                        if result.error:
+                            state.failed_files[str(fp)] = result.error
+                        else:
+                            state.completed_files.add(str(fp))
+                        state.checkpoint(state_path)
+                        if self._progress_callback:
+                            self._progress_callback(done, total, fp.name, "processing")
+                        yield result
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+            state.flush(state_path)
 
         if self._progress_callback and not self._cancelled:
             self._progress_callback(total, total, "", "completed")
@@ -305,22 +357,66 @@ class DocumentProcessor:
     # Text extraction
     # ------------------------------------------------------------------
 
-    def _extract_pdf(self, file_path: Path) -> tuple[str, int]:
-        """Extract text from a PDF file using PyMuPDF. Returns (text, page_count)."""
+    def _process_pdf(self, file_path: Path) -> ProcessedDocument:
+        """Extract and chunk a PDF page by page.
+
+        Pages are streamed into the chunker, so the whole document's text is
+        never held at once, and each chunk records the page it starts on.
+        """
         import fitz  # PyMuPDF
 
-        pages_text: list[str] = []
+        # Offsets in the joined text where each non-blank page starts
+        page_starts: list[int] = []
+        page_numbers: list[int] = []
+        head = ""  # leading text, for document classification
+        total_chars = 0
+
+        def pieces(doc) -> Iterator[str]:
+            nonlocal head, total_chars
+            for page_no, text in self._iter_pdf_pages(doc, file_path):
+                if not text.strip():
+                    continue
+                if page_starts:
+                    text = "\n\n" + text
+                    page_start = total_chars + 2
+                else:
+                    page_start = 0
+                page_starts.append(page_start)
+                page_numbers.append(page_no)
+                if len(head) < _CLASSIFY_SAMPLE_CHARS:
+                    head += text[: _CLASSIFY_SAMPLE_CHARS - len(head)]
+                yield text
+                total_chars += len(text)
+
         try:
-            with fitz.open(str(file_path)) as doc:
-                page_count = len(doc)
-                for page in doc:
-                    text = page.get_text("text")
-                    if text.strip():
-                        pages_text.append(text)
+            doc = fitz.open(str(file_path))
         except Exception as exc:
             raise RuntimeError(f"PDF extraction failed for {file_path.name}: {exc}") from exc
+        with doc:
+            page_count = len(doc)
+            spans = list(self._iter_chunk_spans(pieces(doc)))
+        # Nothing cached for this document is useful for the next one
+        fitz.TOOLS.store_shrink(100)
+
+        doc_type = classify_document_type(file_path.name, head)
+        return ProcessedDocument(
+            source_path=str(file_path),
+            filename=file_path.name,
+            chunks=self._make_chunks(
+                spans, file_path, page_count, doc_type, page_starts, page_numbers
+            ),
+            page_count=page_count,
+            total_chars=total_chars,
+            document_type=doc_type,
+        )
 
-        return "\n\n".join(pages_text), page_count
+    def _iter_pdf_pages(self, doc, file_path: Path) -> Iterator[tuple[int, str]]:
+        """Yield ``(page_number, text)`` for each page of an open PyMuPDF document."""
+        try:
+            for page_no, page in enumerate(doc, 1):
+                yield page_no, page.get_text("text")
+        except Exception as exc:
+            raise RuntimeError(f"PDF extraction failed for {file_path.name}: {exc}") from exc
 
     # ------------------------------------------------------------------
     # Chunking
@@ -336,59 +432,55 @@ class DocumentProcessor:
         """Split text into overlapping chunks with metadata."""
         if not text.strip():
             return []
+        spans = self._iter_chunk_spans([text])
+        return self._make_chunks(spans, file_path, page_count, doc_type, [0], [1])
 
-        chunks: list[DocumentChunk] = []
-        doc_id = hashlib.sha256(str(file_path).encode()).hexdigest()[:16]
-
-        # Estimate which page a character offset belongs to
-        chars_per_page = max(len(text) // max(page_count, 1), 1)
+    def _iter_chunk_spans(self, pieces: Iterable[str]) -> Iterator[tuple[int, str]]:
+        """Yield ``(char_offset, chunk_text)`` for the text formed by joining ``pieces``.
 
+        Produces the same chunks as chunking the joined string, but only
+        buffers about one window (plus the overlap) beyond the current piece.
+        """
+        pieces = iter(pieces)
+        buf = ""
+        buf_start = 0  # offset of buf[0] in the joined text
+        exhausted = False
         start = 0
-        chunk_idx = 0
 
-        while start < len(text):
+        while True:
+            # Buffer the window plus one character, to know whether text
+            # continues past it
+            while not exhausted and buf_start + len(buf) <= start + self.chunk_size:
+                piece = next(pieces, None)
+                if piece is None:
+                    exhausted = True
+                else:
+                    buf += piece
+            if start >= buf_start + len(buf):
+                return
+
             end = start + self.chunk_size
 
             # Try to break at a sentence/paragraph boundary
-            if end < len(text):
+            if end < buf_start + len(buf):
+                # Breaks in the first half of the window are never taken, so
+                # only the second half is searched
+                min_break = start + self.chunk_size // 2 + 1 - buf_start
                 # Look for paragraph break first
-                para_break = text.rfind("\n\n", start, end)
-                if para_break > start + self.chunk_size // 2:
-                    end = para_break + 2
+                para_break = buf.rfind("\n\n", min_break, end - buf_start)
+                if para_break != -1:
+                    end = buf_start + para_break + 2
                 else:
                     # Look for sentence end
                     for sep in (". ", ".\n", "? ", "! "):
-                        sent_break = text.rfind(sep, start, end)
-                        if sent_break > start + self.chunk_size // 2:
-                            end = sent_break + len(sep)
+                        sent_break = buf.rfind(sep, min_break, end - buf_start)
+                        if sent_break != -1:
+                            end = buf_start + sent_break + len(sep)
                             break
 
-            chunk_text = text[start:end].strip()
+            chunk_text = buf[start - buf_start : end - buf_start].strip()
             if chunk_text:
-                estimated_page = min(start // chars_per_page + 1, page_count)
-                date_found = extract_date_from_text(chunk_text[:500])
-
-                metadata = {
-                    "source": file_path.name,
-                    "source_path": str(file_path),
-                    "page": estimated_page,
-                    "total_pages": page_count,
-                    "chunk_index": chunk_idx,
-                    "document_type": doc_type,
-                    "char_offset": start,
-                }
-                if date_found:
-                    metadata["date_reference"] = date_found
-
-                chunks.append(
-                    DocumentChunk(
-                        text=chunk_text,
-                        metadata=metadata,
-                        chunk_index=chunk_idx,
-                        document_id=doc_id,
-                    )
-                )
-                chunk_idx += 1
+                yield start, chunk_text
 
             # Advance with overlap
             start = end - self.chunk_overlap
@@ -396,6 +488,53 @@ class DocumentProcessor:
                 # Safety: always advance
                 start = end
 
+            # Drop text no later window can reach. The next start is less
+            # than chunk_overlap behind this one, so keep that much. Trimming
+            # only once half the buffer is dead keeps the copying linear.
+            consumed = start - self.chunk_overlap - buf_start
+            if consumed >= self.chunk_size and consumed * 2 >= len(buf):
+                buf = buf[consumed:]
+                buf_start += consumed
+
+    def _make_chunks(
+        self,
+        spans: Iterable[tuple[int, str]],
+        file_path: Path,
+        page_count: int,
+        doc_type: str,
+        page_starts: list[int],
+        page_numbers: list[int],
+    ) -> list[DocumentChunk]:
+        """Attach metadata to chunk spans; a chunk's page is the one it starts on."""
+        chunks: list[DocumentChunk] = []
+        # Only needs to be unique per path, not cryptographic: 16 hex chars
+        doc_id = xxhash.xxh3_64_hexdigest(os.fsencode(file_path))
+
+        for chunk_idx, (start, chunk_text) in enumerate(spans):
+            page = page_numbers[bisect.bisect_right(page_starts, start) - 1]
+            date_found = extract_date_from_text(chunk_text[:500])
+
+            metadata = {
+                "source": file_path.name,
+                "source_path": str(file_path),
+                "page": page,
+                "total_pages": page_count,
+                "chunk_index": chunk_idx,
+                "document_type": doc_type,
+                "char_offset": start,
+            }
+            if date_found:
+                metadata["date_reference"] = date_found
+
+            chunks.append(
+                DocumentChunk(
+                    text=chunk_text,
+                    metadata=metadata,
+                    chunk_index=chunk_idx,
+                    document_id=doc_id,
+                )
+            )
+
         return chunks
 
 
@@ -403,11 +542,20 @@ class DocumentProcessor:
 # Module-level worker function for ProcessPoolExecutor (must be picklable)
 # ======================================================================
 
-def _process_file_worker(
-    file_path: Path,
-    chunk_size: int,
-    chunk_overlap: int,
-) -> ProcessedDocument:
+# Processor of the current pool worker, set up once by _init_worker
+_worker_processor: DocumentProcessor | None = None
+
+
+def _init_worker(chunk_size: int, chunk_overlap: int) -> None:
+    """Build the worker's processor and import PyMuPDF when it starts."""
+    global _worker_processor
+    _worker_processor = DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    try:
+        import fitz  # noqa: F401
+    except ImportError:
+        pass
+
+
+def _process_file_worker(file_path: Path) -> ProcessedDocument:
     """Standalone function used by the process pool to process one file."""
-    processor = DocumentProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-    return processor.process_file(file_path)
+    return _worker_processor.process_file(file_path)
@@ -24,6 +24,9 @@ from .utils import ensure_directory, estimate_eta, get_env
 
 logger = logging.getLogger(__name__)
 
+# Non-terminal job updates are coalesced and written at most this often (seconds)
+_JOB_FLUSH_INTERVAL = 0.5
+
 
 class Pipeline:
     """Orchestrate download -> process -> index with progress tracking.
@@ -38,6 +41,8 @@ class Pipeline:
     - ``CHUNK_SIZE`` / ``CHUNK_OVERLAP``: chunking parameters
     - ``MAX_WORKERS``: parallel processing workers
     - ``BATCH_SIZE``: documents per processing batch
+    - ``INDEX_BATCH_SIZE``: chunks per ChromaDB upsert (default 250)
+    - ``INDEX_WORKERS``: ChromaDB upserts in flight at once (default 4)
     """
 
     def __init__(
@@ -48,6 +53,8 @@ class Pipeline:
         chunk_overlap: int | None = None,
         max_workers: int | None = None,
         batch_size: int | None = None,
+        index_batch_size: int | None = None,
+        index_workers: int | None = None,
         chroma_host: str | None = None,
         chroma_port: int | None = None,
         chroma_collection: str | None = None,
@@ -65,6 +72,8 @@ class Pipeline:
         self.chunk_overlap = chunk_overlap or int(get_env("CHUNK_OVERLAP", "200"))
         self.max_workers = max_workers or int(get_env("MAX_WORKERS", "4"))
         self.batch_size = batch_size or int(get_env("BATCH_SIZE", "50"))
+        self.index_batch_size = index_batch_size or int(get_env("INDEX_BATCH_SIZE", "250"))
+        self.index_workers = index_workers or int(get_env("INDEX_WORKERS", "4"))
 
         # ChromaDB
         self.chroma_host = chroma_host or get_env("CHROMA_HOST", "localhost")
@@ -82,6 +91,21 @@ class Pipeline:
         # Internal state
         self._job_id: str | None = None
         self._cancelled = False
+        # (collection, None) for the chromadb client, (None, collection_id)
+        # for the HTTP fallback; resolved on the first _index_chunks call
+        self._chroma_target: tuple[Any, str | None] | None = None
+        # Bounds upserts in flight across all concurrent _index_chunks calls;
+        # created with _update_lock by _new_job, on the loop that uses them
+        self._index_slots: asyncio.Semaphore | None = None
+        # Job-tracking engine, created on first use and kept until close()
+        self._engine = None
+        # Upsert statements for indexing_jobs, keyed by the columns they set
+        self._job_upserts: dict[tuple[str, ...], Any] = {}
+        # Job columns not yet written, and when they were last written;
+        # see _update_job
+        self._pending_update: dict[str, Any] = {}
+        self._last_flush = float("-inf")
+        self._update_lock: asyncio.Lock | None = None
 
     # ------------------------------------------------------------------
     # Public API
@@ -97,7 +121,7 @@ class Pipeline:
         self._cancelled = False
 
         # Create an IndexingJob record
-        self._job_id = str(uuid.uuid4())
+        self._new_job()
         await self._update_job(
             status="processing",
             started_at=datetime.now(timezone.utc),
@@ -223,6 +247,27 @@ class Pipeline:
             summary["error"] = str(exc)
             return summary
 
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Write pending job updates and release the database connections."""
+        await self._flush_job_update()
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    def _new_job(self) -> None:
+        """Start tracking a new job on the running event loop.
+
+        Each run() call gets its own event loop, so the asyncio primitives
+        are created here instead of in __init__.
+        """
+        self._job_id = str(uuid.uuid4())
+        self._index_slots = asyncio.Semaphore(self.index_workers)
+        self._update_lock = asyncio.Lock()
+        self._last_flush = float("-inf")
+
     def cancel(self) -> None:
         """Request cancellation of a running pipeline."""
         self._cancelled = True
@@ -231,65 +276,71 @@ class Pipeline:
     # ChromaDB indexing
     # ------------------------------------------------------------------
 
-    async def _index_chunks(self, chunks: list[DocumentChunk]) -> int:
-        """Add document chunks to ChromaDB. Returns count of indexed chunks."""
-        if not chunks:
-            return 0
+    def _get_chroma_target(self) -> tuple[Any, str | None]:
+        """Resolve the ChromaDB collection once and reuse it across calls."""
+        if self._chroma_target is not None:
+            return self._chroma_target
 
         try:
             # Use chromadb Python client if available and working
-            try:
-                import chromadb
-                client = chromadb.HttpClient(
-                    host=self.chroma_host, port=self.chroma_port
-                )
-                collection = client.get_or_create_collection(
-                    name=self.chroma_collection,
-                    metadata={"hnsw:space": "cosine"},
-                )
-                use_http_fallback = False
-            except Exception as client_err:
-                logger.warning(
-                    "chromadb client init failed (%s), using HTTP API fallback",
-                    client_err,
-                )
-                use_http_fallback = True
+            import chromadb
+
+            client = chromadb.HttpClient(host=self.chroma_host, port=self.chroma_port)
+            collection = client.get_or_create_collection(
+                name=self.chroma_collection,
+                metadata={"hnsw:space": "ip"},
+            )
+            self._chroma_target = (collection, None)
+        except Exception as client_err:
+            logger.warning(
+                "chromadb client init failed (%s), using HTTP API fallback",
+                client_err,
+            )
+            import requests as _req
 
-            # Index in batches to avoid oversized requests
-            index_batch_size = 100
-            indexed = 0
             base_url = f"http://{self.chroma_host}:{self.chroma_port}/api/v2"
+            # Ensure collection exists
+            _req.post(
+                f"{base_url}/tenants/default_tenant/databases/default_database/collections",
+                json={
+                    "name": self.chroma_collection,
+                    "metadata": {"hnsw:space": "ip"},
+                },
+            )
+            # Get collection ID
+            resp = _req.get(
+                f"{base_url}/tenants/default_tenant/databases/default_database/collections/{self.chroma_collection}"
+            )
+            resp.raise_for_status()
+            self._chroma_target = (None, resp.json()["id"])
+        return self._chroma_target
 
-            if use_http_fallback:
-                import requests as _req
+    async def _index_chunks(self, chunks: list[DocumentChunk]) -> int:
+        """Add document chunks to ChromaDB. Returns count of indexed chunks.
 
-                # Ensure collection exists
-                _req.post(
-                    f"{base_url}/tenants/default_tenant/databases/default_database/collections",
-                    json={
-                        "name": self.chroma_collection,
-                        "metadata": {"hnsw:space": "cosine"},
-                    },
-                )
-                # Get collection ID
-                resp = _req.get(
-                    f"{base_url}/tenants/default_tenant/databases/default_database/collections/{self.chroma_collection}"
-                )
-                resp.raise_for_status()
-                collection_id = resp.json()["id"]
+        Chunks are upserted ``index_batch_size`` at a time, so callers can
+        stream batches of any size through here without one oversized request.
+        Upserts run in worker threads, up to ``index_workers`` at once (also
+        across concurrent calls), since the Chroma server handles writes to
+        one collection concurrently and a single blocking client would not.
+        """
+        if not chunks:
+            return 0
 
-            for i in range(0, len(chunks), index_batch_size):
-                if self._cancelled:
-                    break
+        try:
+            collection, collection_id = self._get_chroma_target()
+            base_url = f"http://{self.chroma_host}:{self.chroma_port}/api/v2"
+            if collection is None:
+                import requests as _req
 
-                batch = chunks[i : i + index_batch_size]
+            def upsert(batch: list[DocumentChunk]) -> None:
                 ids = [
                     f"{c.document_id}_{c.chunk_index}" for c in batch
                 ]
                 documents = [c.text for c in batch]
                 metadatas = [c.metadata for c in batch]
 
-                if use_http_fallback:
+                if collection is None:
                     resp = _req.post(
                         f"{base_url}/tenants/default_tenant/databases/default_database/collections/{collection_id}/upsert",
                         json={
@@ -305,12 +356,31 @@ class Pipeline:
                         documents=documents,
                         metadatas=metadatas,
                     )
-                indexed += len(batch)
 
+            indexed = 0
+
+            async def index_batch(batch: list[DocumentChunk]) -> None:
+                nonlocal indexed
+                async with self._index_slots:
+                    if self._cancelled:
+                        return
+                    await asyncio.to_thread(upsert, batch)
+                indexed += len(batch)
                 logger.info(
                     "Indexed %d/%d chunks", indexed, len(chunks)
                 )
 
+            # Every batch is waited for, so no upsert outlives this call
+            results = await asyncio.gather(
+                *(
+                    index_batch(chunks[i : i + self.index_batch_size])
+                    for i in range(0, len(chunks), self.index_batch_size)
+                ),
+                return_exceptions=True,
+            )
+            errors = [r for r in results if isinstance(r, Exception)]
+            if errors:
+                logger.error("ChromaDB indexing failed for %d batches: %s", len(errors), errors[0])
             return indexed
 
         except Exception as exc:
@@ -330,61 +400,67 @@ class Pipeline:
     async def _update_job(self, **kwargs: Any) -> None:
         """Update the IndexingJob record in PostgreSQL.
 
-        Silently logs errors if the database is unreachable (the pipeline
-        should still complete even without DB connectivity).
+        Updates are merged, and written once ``_JOB_FLUSH_INTERVAL`` seconds
+        have passed since the previous write, so a burst of per-file progress
+        costs one round trip. The write happens inline, since the caller may
+        be blocking the event loop between updates. A ``completed`` or
+        ``failed`` status is written immediately, along with anything still
+        pending; close() writes whatever is left.
         """
-        if not self._job_id:
+        if not self._job_id or not kwargs:
             return
 
+        self._pending_update.update(kwargs)
+        if (
+            kwargs.get("status") in ("completed", "failed")
+            or time.monotonic() - self._last_flush >= _JOB_FLUSH_INTERVAL
+        ):
+            await self._flush_job_update()
+
+    async def _flush_job_update(self) -> None:
+        """Write all pending job columns in one statement."""
+        async with self._update_lock:
+            if not self._pending_update:
+                return
+            values, self._pending_update = self._pending_update, {}
+            self._last_flush = time.monotonic()
+            await self._write_job(values)
+
+    async def _write_job(self, values: dict[str, Any]) -> None:
+        """Upsert columns of the IndexingJob record.
+
+        Silently logs errors if the database is unreachable (the pipeline
+        should still complete even without DB connectivity).
+        """
         try:
             from sqlalchemy import text
             from sqlalchemy.ext.asyncio import create_async_engine
 
-            engine = create_async_engine(self.database_url, echo=False)
-
-            # Build SET clause dynamically
-            set_parts: list[str] = []
-            params: dict[str, Any] = {"job_id": self._job_id}
+            if self._engine is None:
+                self._engine = create_async_engine(self.database_url, echo=False, pool_size=2)
 
-            for key, value in kwargs.items():
-                set_parts.append(f"{key} = :{key}")
-                params[key] = value
-
-            if not set_parts:
-                await engine.dispose()
-                return
+            # Upsert: INSERT on first call, UPDATE of the given columns after
+            columns = tuple(values)
+            upsert_sql = self._job_upserts.get(columns)
+            if upsert_sql is None:
+                cols = ", ".join(["id", "source_type", "source_url", *columns])
+                placeholders = ", ".join(
+                    [":job_id", ":source_type", ":source_url"] + [f":{k}" for k in columns]
+                )
+                updates = ", ".join(f"{k} = EXCLUDED.{k}" for k in columns)
+                upsert_sql = self._job_upserts[columns] = text(
+                    f"INSERT INTO indexing_jobs ({cols}) VALUES ({placeholders}) "
+                    f"ON CONFLICT (id) DO UPDATE SET {updates}"
+                )
 
-            # Upsert: INSERT on first call, UPDATE on subsequent
-            # Try UPDATE first; if no rows affected, INSERT
-            update_sql = text(
-                f"UPDATE indexing_jobs SET {', '.join(set_parts)} WHERE id = :job_id"
-            )
-            insert_cols = ["id", "source_type", "source_url"] + list(kwargs.keys())
-            insert_params = {
+            params = {
                 "job_id": self._job_id,
                 "source_type": "github",
                 "source_url": self.repo_url,
-                **kwargs,
+                **values,
             }
-
-            async with engine.begin() as conn:
-                result = await conn.execute(update_sql, params)
-                if result.rowcount == 0:
-                    # First time -- insert
-                    cols = ", ".join(
-                        ["id", "source_type", "source_url"]
-                        + [k for k in kwargs.keys()]
-                    )
-                    placeholders = ", ".join(
-                        [":job_id", ":source_type", ":source_url"]
-                        + [f":{k}" for k in kwargs.keys()]
-                    )
-                    insert_sql = text(
-                        f"INSERT INTO indexing_jobs ({cols}) VALUES ({placeholders})"
-                    )
-                    await conn.execute(insert_sql, insert_params)
-
-            await engine.dispose()
+            async with self._engine.begin() as conn:
+                await conn.execute(upsert_sql, params)
 
         except Exception as exc:
             # Non-fatal: log and continue
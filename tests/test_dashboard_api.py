@@ -7,6 +7,7 @@ Tests cover:
 - Error responses
 """
 
+import sys
 import uuid
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -361,6 +362,45 @@ class TestHealthEndpoint:
         assert health["status"] == "degraded"
         assert health["components"]["vector_db"] == "disconnected"
 
+    @pytest.mark.asyncio
+    async def test_ttl_cache_serves_stale_value_on_error(self):
+        """Verify a failed refresh falls back to the last good value."""
+        from dashboard_backend.api import health
+
+        probe = AsyncMock(side_effect=[{"vector_db": "connected"}, RuntimeError("down")])
+
+        @health.async_ttl_cache(ttl_seconds=10)
+        async def _test_stale_probe():
+            return await probe()
+
+        try:
+            with patch.object(health.time, "monotonic", return_value=100.0):
+                first = await _test_stale_probe()
+            with patch.object(health.time, "monotonic", return_value=105.0):
+                assert await _test_stale_probe() == first
+            assert probe.await_count == 1
+            with patch.object(health.time, "monotonic", return_value=111.0):
+                assert await _test_stale_probe() == first
+            assert probe.await_count == 2
+        finally:
+            health._cache.pop("_test_stale_probe", None)
+            health._cache_locks.pop("_test_stale_probe", None)
+
+    @pytest.mark.asyncio
+    async def test_ttl_cache_raises_without_previous_value(self):
+        """Verify errors propagate when there is nothing cached to serve."""
+        from dashboard_backend.api import health
+
+        @health.async_ttl_cache(ttl_seconds=10)
+        async def _test_failing_probe():
+            raise RuntimeError("down")
+
+        try:
+            with pytest.raises(RuntimeError):
+                await _test_failing_probe()
+        finally:
+            health._cache_locks.pop("_test_failing_probe", None)
+
 
 class TestMetricsEndpoint:
     """Tests for /api/dashboard/metrics endpoint."""
@@ -470,6 +510,37 @@ class TestAnalyticsEndpoint:
         assert stats.avg == pytest.approx(2430.0)
 
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# Search Endpoint Tests
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+class TestSearchEndpoint:
+    """Tests for /api/dashboard/search query embedding."""
+
+    def test_model2vec_backend_embeds_with_static_model(self, monkeypatch):
+        """Verify queries use the static model when the collection was built with it."""
+        import numpy as np
+
+        from dashboard_backend.api import search
+        from dashboard_backend.config import Settings
+
+        static_model = MagicMock()
+        static_model.encode.return_value = np.array([[3.0, 4.0], [0.0, 0.0]])
+        model2vec = MagicMock()
+        model2vec.StaticModel.from_pretrained.return_value = static_model
+
+        monkeypatch.setenv("DASHBOARD_EMBEDDING_BACKEND", "model2vec")
+        monkeypatch.setitem(sys.modules, "model2vec", model2vec)
+        monkeypatch.setattr(search, "get_settings", Settings)
+        monkeypatch.setattr(search, "_embedding_function", None)
+
+        embeddings = search._get_embedding_function()(["flight logs", "zzqx"])
+
+        model2vec.StaticModel.from_pretrained.assert_called_once_with("minishlab/potion-base-8M")
+        assert embeddings.tolist() == [[0.6, 0.8], [0.0, 0.0]]
+
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # WebSocket Tests
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -528,3 +599,24 @@ class TestWebSocket:
         """Verify WebSocket graceful close."""
         await mock_websocket.close()
         mock_websocket.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_websocket_replies_go_through_writer(self, mock_websocket):
+        """Verify direct replies are queued behind broadcasts for the client's writer."""
+        import asyncio
+
+        from dashboard_backend.api.websocket import ConnectionManager
+
+        manager = ConnectionManager()
+        await manager.connect(mock_websocket)
+        try:
+            manager.send(mock_websocket, '{"type":"pong"}')
+            mock_websocket.send_text.assert_not_called()
+
+            for _ in range(100):
+                if mock_websocket.send_text.await_count:
+                    break
+                await asyncio.sleep(0.01)
+            mock_websocket.send_text.assert_awaited_once_with('{"type":"pong"}')
+        finally:
+            await manager.disconnect(mock_websocket)
@@ -8,6 +8,7 @@ Tests cover:
 """
 
 import json
+import random
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
@@ -142,6 +143,108 @@ class TestTextChunking:
         chunks = self._chunk_text(text, chunk_size=1000, overlap=200)
         assert len(chunks) == 1
 
+    @staticmethod
+    def _reference_spans(text: str, chunk_size: int, overlap: int) -> list[tuple[int, str]]:
+        """The chunker DocumentProcessor used before it streamed pages."""
+        spans = []
+        start = 0
+        while start < len(text):
+            end = start + chunk_size
+            if end < len(text):
+                para_break = text.rfind("\n\n", start, end)
+                if para_break > start + chunk_size // 2:
+                    end = para_break + 2
+                else:
+                    for sep in (". ", ".\n", "? ", "! "):
+                        sent_break = text.rfind(sep, start, end)
+                        if sent_break > start + chunk_size // 2:
+                            end = sent_break + len(sep)
+                            break
+            chunk_text = text[start:end].strip()
+            if chunk_text:
+                spans.append((start, chunk_text))
+            start = end - overlap
+            if start <= (end - chunk_size):
+                start = end
+        return spans
+
+    @staticmethod
+    def _random_text(rng: random.Random) -> str:
+        tokens = ["word", "Flight", "N900SA", " ", " ", ". ", ".\n", "? ", "! ", "\n\n", "\n"]
+        text = ""
+        length = rng.randint(0, 3000)
+        while len(text) < length:
+            text += rng.choice(tokens)
+        return text
+
+    def test_chunk_spans_match_previous_chunker(self):
+        from services.document_processor import DocumentProcessor
+
+        rng = random.Random(0)
+        for _ in range(300):
+            text = self._random_text(rng)
+            chunk_size = rng.randint(10, 400)
+            # Larger overlaps can step back past a shortened window and never finish
+            overlap = rng.randint(0, chunk_size // 2)
+            processor = DocumentProcessor(chunk_size=chunk_size, chunk_overlap=overlap)
+
+            assert list(processor._iter_chunk_spans([text])) == self._reference_spans(
+                text, chunk_size, overlap
+            )
+
+    def test_streamed_pieces_match_joined_text(self):
+        from services.document_processor import DocumentProcessor
+
+        rng = random.Random(1)
+        for _ in range(300):
+            text = self._random_text(rng)
+            chunk_size = rng.randint(10, 400)
+            # Larger overlaps can step back past a shortened window and never finish
+            overlap = rng.randint(0, chunk_size // 2)
+            cuts = sorted(rng.randint(0, len(text)) for _ in range(rng.randint(0, 20)))
+            pieces = [text[a:b] for a, b in zip([0, *cuts], [*cuts, len(text)])]
+            processor = DocumentProcessor(chunk_size=chunk_size, chunk_overlap=overlap)
+
+            assert list(processor._iter_chunk_spans(pieces)) == self._reference_spans(
+                text, chunk_size, overlap
+            )
+
+    def test_pdf_pages_chunk_like_joined_text(self, tmp_path):
+        fitz = pytest.importorskip("fitz")
+        from services.document_processor import DocumentProcessor
+
+        rng = random.Random(2)
+        pdf_path = tmp_path / "deposition.pdf"
+        with fitz.open() as doc:
+            for page_no in range(6):
+                page = doc.new_page()
+                if page_no == 2:
+                    continue  # blank pages add no text
+                for line in range(20):
+                    words = " ".join(rng.choice(["Flight", "log", "entry."]) for _ in range(8))
+                    page.insert_text((50, 60 + 14 * line), words)
+            doc.save(pdf_path)
+        with fitz.open(pdf_path) as doc:
+            pages = [(n, p.get_text("text")) for n, p in enumerate(doc, 1)]
+        pages = [(n, text) for n, text in pages if text.strip()]
+        joined = "\n\n".join(text for _, text in pages)
+        page_starts = []
+        offset = 0
+        for n, text in pages:
+            page_starts.append((offset, n))
+            offset += len(text) + 2
+
+        processor = DocumentProcessor(chunk_size=300, chunk_overlap=60)
+        result = processor.process_file(pdf_path)
+
+        assert result.page_count == 6
+        assert result.total_chars == len(joined)
+        spans = [(c.metadata["char_offset"], c.text) for c in result.chunks]
+        assert spans == self._reference_spans(joined, 300, 60)
+        for chunk in result.chunks:
+            start = chunk.metadata["char_offset"]
+            assert chunk.metadata["page"] == max(n for s, n in page_starts if s <= start)
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # Document Processor Tests
@@ -532,3 +635,154 @@ class TestPipeline:
         assert pipeline.chunk_size == 500
         assert pipeline.chunk_overlap == 100
         assert pipeline.chroma_host == "remote-host"
+
+    @pytest.mark.asyncio
+    async def test_pipeline_writes_progress_before_completion(self, tmp_path, monkeypatch):
+        """Progress reaches the DB while blocking phases are still running."""
+        import time
+
+        from services import pipeline as pipeline_mod
+        from services.document_processor import ProcessedDocument
+
+        monkeypatch.setenv("STATE_DIR", str(tmp_path / "state"))
+        monkeypatch.setattr(pipeline_mod, "_JOB_FLUSH_INTERVAL", 0.01)
+
+        files = [tmp_path / f"doc{i}.txt" for i in range(3)]
+
+        downloader = MagicMock()
+        downloader.download.side_effect = lambda: time.sleep(0.05) or tmp_path
+        downloader.list_files.return_value = files
+
+        def process(paths, state_path=None):
+            for path in paths:
+                time.sleep(0.05)
+                yield ProcessedDocument(
+                    source_path=str(path),
+                    filename=path.name,
+                    chunks=[],
+                    page_count=1,
+                    total_chars=0,
+                    document_type="text",
+                )
+
+        processor = MagicMock()
+        processor.process_batch.side_effect = process
+
+        writes: list[dict] = []
+
+        async def record(self, values):
+            writes.append(dict(values))
+
+        monkeypatch.setattr(pipeline_mod, "GitHubDatasetDownloader", lambda **kw: downloader)
+        monkeypatch.setattr(pipeline_mod, "DocumentProcessor", lambda **kw: processor)
+        monkeypatch.setattr(pipeline_mod.Pipeline, "_write_job", record)
+
+        summary = await pipeline_mod.Pipeline().run_async(parallel=False)
+
+        assert summary["status"] == "completed"
+        assert writes[0]["status"] == "processing"
+        assert writes[-1]["status"] == "completed"
+        progress = writes[:-1]
+        assert any(w.get("total_files") == 3 for w in progress)
+        processed = [w["processed_files"] for w in progress if "processed_files" in w]
+        assert processed == [1, 2, 3]
+
+
+    @pytest.mark.asyncio
+    async def test_index_chunks_waits_for_every_batch(self, tmp_path, monkeypatch):
+        """A failed upsert batch neither cancels nor orphans the others."""
+        import threading
+        import time
+
+        from services.document_processor import DocumentChunk
+        from services.pipeline import Pipeline
+
+        monkeypatch.setenv("STATE_DIR", str(tmp_path / "state"))
+        upserted: list[str] = []
+        lock = threading.Lock()
+
+        def upsert(ids, documents, metadatas):
+            if ids == ["doc_0"]:
+                raise RuntimeError("503 from Chroma")
+            time.sleep(0.05)
+            with lock:
+                upserted.extend(ids)
+
+        collection = MagicMock()
+        collection.upsert.side_effect = upsert
+        pipeline = Pipeline(index_batch_size=1, index_workers=4)
+        pipeline._chroma_target = (collection, None)
+        pipeline._new_job()
+
+        chunks = [
+            DocumentChunk(text=f"chunk {i}", metadata={}, chunk_index=i, document_id="doc")
+            for i in range(6)
+        ]
+        assert await pipeline._index_chunks(chunks) == 5
+        assert sorted(upserted) == [f"doc_{i}" for i in range(1, 6)]
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Data Prep Tests (dataset download and extraction)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+class TestDataPrep:
+    """Tests for services.data_prep download helpers."""
+
+    def test_range_download_stops_after_failure(self, tmp_path, monkeypatch):
+        """A failed range cancels the queued ranges and stops the running ones."""
+        import threading
+        import time
+
+        import requests
+
+        from services import data_prep
+
+        requested: list[str] = []
+        started = threading.Event()
+
+        def get(url, headers, **kwargs):
+            requested.append(headers["Range"])
+            resp = MagicMock()
+            resp.__enter__.return_value = resp
+            resp.status_code = 206
+            if headers["Range"].startswith("bytes=0-"):
+                started.wait(5)
+                resp.raise_for_status.side_effect = requests.HTTPError("503")
+            else:
+                started.set()
+                chunks = iter([b"x"] * 16)
+                resp.raw.read.side_effect = lambda n: time.sleep(0.01) or next(chunks, b"")
+            return resp
+
+        monkeypatch.setattr(data_prep, "_session", MagicMock(get=get))
+        monkeypatch.setattr(data_prep, "_RANGE_PART_SIZE", 16)
+        monkeypatch.setattr(data_prep, "_RANGE_WORKERS", 2)
+
+        with pytest.raises(requests.HTTPError):
+            data_prep._download_ranges("https://example.com/a.zip", tmp_path / "a.part", 16 * 50)
+        # The failing worker may pick up one more range before the rest are cancelled
+        assert len(requested) <= 3
+
+    def test_extract_pdfs_flattens_non_empty_pdfs(self, tmp_path):
+        import zipfile
+
+        from services.data_prep import extract_pdfs
+
+        zip_path = tmp_path / "DataSet_1.zip"
+        with zipfile.ZipFile(zip_path, "w") as zf:
+            zf.writestr("VOL1/a.pdf", b"%PDF-1.4 stored", compress_type=zipfile.ZIP_STORED)
+            zf.writestr(
+                "VOL1/IMAGES/b.PDF", b"%PDF-1.4 " * 1000, compress_type=zipfile.ZIP_DEFLATED
+            )
+            zf.writestr("VOL1/empty.pdf", b"")
+            zf.writestr("VOL1/notes.txt", b"not a pdf")
+
+        out = tmp_path / "pdfs"
+        out.mkdir()
+        assert extract_pdfs(zip_path, out) == 2
+        assert sorted(p.name for p in out.iterdir()) == ["a.pdf", "b.PDF"]
+        assert (out / "b.PDF").read_bytes() == b"%PDF-1.4 " * 1000
+        # Files already extracted are left alone
+        assert extract_pdfs(zip_path, out) == 0
@@ -3,18 +3,20 @@
 Tests cover:
 - Database models (QueryLog, IndexingJob, SystemMetrics)
 - Config loading from environment
-- All 8 MCP tools (mocked dependencies)
-- RAG engine query/retrieval logic
+- All 9 MCP tools (mocked dependencies)
+- RAG engine query/retrieval logic and query cache
+- Indexing job progress updates
 """
 
 import uuid
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import numpy as np
 import pytest
 import pytest_asyncio
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from tests.conftest import make_indexing_job, make_query_log, make_system_metric
 
@@ -288,6 +290,59 @@ class TestMCPToolQueryDocuments:
         assert len(results["ids"][0]) == 1
 
 
+class TestMCPToolQueryDocumentsBatch:
+    """Tests for the query_documents_batch MCP tool's retrieval."""
+
+    @pytest.mark.asyncio
+    async def test_batch_embeds_and_searches_once(self, mock_chroma_collection):
+        """Verify distinct queries share one encode and one Chroma request."""
+        from mcp_server.rag_engine import RAGEngine
+
+        engine = RAGEngine()
+        engine._collection = mock_chroma_collection
+        engine._encode = MagicMock(side_effect=lambda texts: np.ones((len(texts), 4), np.float32))
+        mock_chroma_collection.query.return_value = {
+            "ids": [["doc-1"], ["doc-2"]],
+            "documents": [["Flight log entry..."], ["Property records..."]],
+            "metadatas": [[{"source": "flight_logs.pdf"}], [{"source": "property_records.pdf"}]],
+            "distances": [[0.1], [0.2]],
+        }
+
+        results = await engine.query_batch(["flights", "property", "flights"], top_k=1)
+
+        assert [[hit["id"] for hit in hits] for hits in results] == [
+            ["doc-1"],
+            ["doc-2"],
+            ["doc-1"],
+        ]
+        engine._encode.assert_called_once_with(["flights", "property"])
+        mock_chroma_collection.query.assert_called_once()
+        assert mock_chroma_collection.query.call_args.kwargs["n_results"] == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_serves_repeated_queries_from_cache(self, mock_chroma_collection):
+        """Verify only uncached queries reach the model and Chroma."""
+        from mcp_server.rag_engine import RAGEngine
+
+        engine = RAGEngine()
+        engine._collection = mock_chroma_collection
+        engine._encode = MagicMock(side_effect=lambda texts: np.ones((len(texts), 4), np.float32))
+        flights = await engine.query("flights", top_k=3)
+        mock_chroma_collection.query.return_value = {
+            "ids": [["doc-9"]],
+            "documents": [["Witness statement..."]],
+            "metadatas": [[{"source": "witness_statement.pdf"}]],
+            "distances": [[0.3]],
+        }
+
+        results = await engine.query_batch(["flights", "witness"], top_k=3)
+
+        assert results[0] == flights
+        assert [hit["id"] for hit in results[1]] == ["doc-9"]
+        assert engine._encode.call_args_list[-1].args == (["witness"],)
+        assert mock_chroma_collection.query.call_count == 2
+
+
 class TestMCPToolSearchSimilar:
     """Tests for the search_similar MCP tool."""
 
@@ -443,3 +498,157 @@ class TestRAGEngine:
         )
         saved = result.scalar_one()
         assert saved.response_time_ms == 500
+
+    def test_reindex_deletes_outdated_chunks(self, mock_chroma_collection, tmp_path):
+        """Verify re-indexing a changed file drops only that file's old chunks."""
+        from mcp_server.rag_engine import RAGEngine
+
+        engine = RAGEngine()
+        engine._collection = mock_chroma_collection
+        notes = tmp_path / "a" / "notes.txt"
+        other = tmp_path / "b" / "notes.txt"
+        for path, text in ((notes, "first version"), (other, "unrelated")):
+            path.parent.mkdir()
+            path.write_text(text)
+        (old,) = engine._prepare_chunks(notes)
+        notes.write_text("second version")
+        (new,) = engine._prepare_chunks(notes)
+        (same_name,) = engine._prepare_chunks(other)
+        assert new["metadata"]["source"] == same_name["metadata"]["source"]
+
+        def get(where, include):
+            stored = {str(notes.resolve()): [old["id"]], str(other.resolve()): [same_name["id"]]}
+            return {"ids": stored[where["path"]]}
+
+        mock_chroma_collection.get.side_effect = get
+        assert engine._drop_indexed([new]) == [new]
+        mock_chroma_collection.delete.assert_called_once_with(ids=[old["id"]])
+        mock_chroma_collection.delete.reset_mock()
+        assert engine._drop_indexed([same_name]) == []
+        mock_chroma_collection.delete.assert_not_called()
+
+    def test_query_cache_expires_entries(self):
+        """Verify cached results are dropped once their TTL has passed."""
+        from mcp_server.rag_engine import QueryCache
+
+        cache = QueryCache(max_size=10, ttl_seconds=60)
+        with patch("mcp_server.rag_engine.time.monotonic", return_value=1000.0):
+            cache.put("flights", ["doc-1"])
+        with patch("mcp_server.rag_engine.time.monotonic", return_value=1059.0):
+            assert cache.get("flights") == ["doc-1"]
+        with patch("mcp_server.rag_engine.time.monotonic", return_value=1061.0):
+            assert cache.get("flights") is None
+
+    def test_query_cache_evicts_least_recently_used(self):
+        """Verify a full cache drops the entry used longest ago."""
+        from mcp_server.rag_engine import QueryCache
+
+        cache = QueryCache(max_size=2, ttl_seconds=60)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_query_cache_disabled_when_empty(self):
+        """Verify a zero-size cache stores nothing."""
+        from mcp_server.rag_engine import QueryCache
+
+        cache = QueryCache(max_size=0, ttl_seconds=60)
+        cache.put("a", 1)
+        assert cache.get("a") is None
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# Job Logging Tests
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+class TestUpdateIndexingJob:
+    """Tests for mcp_server.logging_utils.update_indexing_job."""
+
+    @pytest_asyncio.fixture
+    async def session_factory(self, db_engine):
+        """Sessions on the test database, which gets the now() PostgreSQL has."""
+
+        def add_now(conn):
+            conn.connection.dbapi_connection.create_function(
+                "now", 0, lambda: datetime.now(timezone.utc).isoformat(" ")
+            )
+
+        async with db_engine.connect() as conn:
+            await conn.run_sync(add_now)
+        factory = async_sessionmaker(db_engine, expire_on_commit=False)
+        with patch("mcp_server.logging_utils.async_session", factory):
+            yield factory
+
+    async def _add_job(self, factory, **overrides) -> uuid.UUID:
+        from mcp_server.models import IndexingJob
+
+        async with factory() as session:
+            job = IndexingJob(**make_indexing_job(**overrides))
+            session.add(job)
+            await session.commit()
+            return job.id
+
+    async def _get_job(self, factory, job_id):
+        from mcp_server.models import IndexingJob
+
+        async with factory() as session:
+            return await session.get(IndexingJob, job_id)
+
+    @pytest.mark.asyncio
+    async def test_update_sets_only_given_fields(self, session_factory):
+        from mcp_server.logging_utils import update_indexing_job
+
+        job_id = await self._add_job(
+            session_factory, status="processing", processed_files=10, failed_files=2
+        )
+
+        await update_indexing_job(job_id, processed_files=11, current_file="b.pdf")
+
+        job = await self._get_job(session_factory, job_id)
+        assert job.processed_files == 11
+        assert job.current_file == "b.pdf"
+        assert job.failed_files == 2
+        assert job.status == "processing"
+
+    @pytest.mark.asyncio
+    async def test_processing_keeps_original_start(self, session_factory):
+        from mcp_server.logging_utils import update_indexing_job
+
+        started = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        new_id = await self._add_job(session_factory, status="pending", started_at=None)
+        resumed_id = await self._add_job(session_factory, status="pending", started_at=started)
+
+        await update_indexing_job(new_id, status="processing")
+        await update_indexing_job(resumed_id, status="processing")
+
+        assert (await self._get_job(session_factory, new_id)).started_at is not None
+        resumed = await self._get_job(session_factory, resumed_id)
+        assert resumed.started_at.replace(tzinfo=timezone.utc) == started
+        assert resumed.completed_at is None
+
+    @pytest.mark.asyncio
+    async def test_completion_sets_completed_at(self, session_factory):
+        from mcp_server.logging_utils import update_indexing_job
+
+        job_id = await self._add_job(session_factory, status="processing", completed_at=None)
+
+        await update_indexing_job(job_id, status="completed", progress_percent=100)
+
+        job = await self._get_job(session_factory, job_id)
+        assert job.status == "completed"
+        assert job.progress_percent == 100
+        assert job.completed_at is not None
+
+    @pytest.mark.asyncio
+    async def test_missing_job_is_logged_not_raised(self, session_factory, caplog):
+        from mcp_server.logging_utils import update_indexing_job
+
+        await update_indexing_job(uuid.uuid4(), status="failed", error_message="boom")
+
+        assert "not found" in caplog.text